@@ -0,0 +1,109 @@
+# batch_transcribe.py
+# Transcribes recorded meetings after the fact, several files at a time. Each worker
+# process loads Whisper and pyannote once; every file is diarized as a whole (not in
+# 10 s pieces), so speaker labels are consistent across the recording.
+#
+#   python batch_transcribe.py "assets/sample_meeting_*.wav" --workers 2
+#
+# Writes "[Speaker N] ..." transcripts like assets/transcript_*.txt.
+import argparse
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import torch
+import whisper
+
+from modules.diarization import load_diarization_pipeline, diarize_chunk
+from modules.stream_transcriber import assign_speakers, transcribe_chunk, CPU_COUNT
+
+SAMPLERATE = 16000
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg")
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "2"))
+
+_models = {}  # per worker process
+
+
+def _load_models(whisper_size, num_threads):
+    torch.set_num_threads(num_threads)  # the workers split the cores
+    _models["whisper"] = whisper.load_model(whisper_size)
+    _models["diarization"] = load_diarization_pipeline()
+
+
+def output_path(audio_path, out_dir):
+    name = os.path.splitext(os.path.basename(audio_path))[0]
+    return os.path.join(out_dir, f"transcript_{name}.txt")
+
+
+def transcribe_file(audio_path, out_dir):
+    start = time.perf_counter()
+    audio = whisper.audio.load_audio(audio_path, sr=SAMPLERATE)  # mono float32
+    segments = transcribe_chunk(_models["whisper"], audio)
+    speaker_turns = diarize_chunk(_models["diarization"], audio, SAMPLERATE)
+    lines = assign_speakers(segments, speaker_turns)
+    path = output_path(audio_path, out_dir)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    return path, len(audio) / SAMPLERATE, time.perf_counter() - start
+
+
+def find_audio(inputs):
+    # directories, globs or files, in order, without duplicates
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(
+                os.path.join(item, name) for name in os.listdir(item) if name.lower().endswith(AUDIO_EXTENSIONS)
+            )
+        else:
+            matches = sorted(glob.glob(item))
+        paths.extend(matches)
+    return list(dict.fromkeys(paths))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe and diarize recorded meetings in parallel")
+    parser.add_argument("inputs", nargs="+", help="audio files, directories or globs")
+    parser.add_argument("--out-dir", default="assets/batch_transcripts")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--whisper", default="small")
+    args = parser.parse_args()
+
+    paths = find_audio(args.inputs)
+    if not paths:
+        parser.error("no audio files found")
+    os.makedirs(args.out_dir, exist_ok=True)
+    workers = max(1, min(args.workers, len(paths)))
+    num_threads = max(1, CPU_COUNT // workers)
+    print(f"🎧 {len(paths)} files, {workers} workers × {num_threads} threads, Whisper {args.whisper}")
+
+    start = time.perf_counter()
+    audio_seconds = 0.0
+    failed = 0
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),  # fork is unsafe once torch threads exist
+        initializer=_load_models,
+        initargs=(args.whisper, num_threads),
+    ) as pool:
+        futures = {pool.submit(transcribe_file, path, args.out_dir): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                out_path, duration, seconds = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"❌ {futures[future]}: {e}")
+                continue
+            audio_seconds += duration
+            print(f"✅ {futures[future]} → {out_path} ({duration:.0f}s audio, RTF {seconds / duration:.2f})")
+
+    elapsed = time.perf_counter() - start
+    done = len(paths) - failed
+    print(f"\n{done} files in {elapsed:.0f}s: {done / elapsed * 3600:.0f} files/hour, "
+          f"RTF {elapsed / audio_seconds if audio_seconds else 0:.3f} (wall clock / audio, incl. model loading)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/commitment_recall.py
+# Recall of the rule-based commitment pre-filter against the reference action items in
+# result/test_results_*.txt. Each reference item is matched to the transcript line that
+# shares the most content words with it; the pre-filter "recalls" the item when it keeps
+# that line. Also reports how much of the prompt the pre-filter removes and how many
+# reference items the rules-only extractor finds on its own. No model is loaded.
+#
+#   python -m benchmarks.commitment_recall
+import argparse
+import glob
+import os
+import re
+
+from modules.commitment_filter import CONTEXT_LINES, COMMITMENT_THRESHOLD, extract_action_items_rules, select_candidate_lines
+from modules.action_items_format import parse_action_items
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "to", "of", "for", "by", "on", "in", "with", "it", "its",
+    "i", "i'll", "we", "we'll", "will", "can", "be", "is", "are", "this", "that", "our", "my",
+}
+
+
+def content_words(text):
+    words = re.findall(r"[a-z0-9']+", text.replace("’", "'").lower())
+    return {w.rstrip("s") for w in words if w not in STOPWORDS and len(w) > 2}
+
+
+def reference_items(path):
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    section = text.split("=== Action Items ===")[-1]
+    return [
+        line.lstrip("-* ").strip()
+        for line in section.splitlines()
+        if line.strip().startswith(("-", "*"))
+    ]
+
+
+def best_line(item, lines):
+    words = content_words(item)
+    scores = [len(words & content_words(line)) for line in lines]
+    best = max(range(len(lines)), key=lambda i: scores[i])
+    return best if scores[best] else None
+
+
+def item_found(item, tasks, min_overlap=0.5):
+    words = content_words(item)
+    return any(len(words & content_words(task)) >= min_overlap * len(words) for task in tasks) if words else False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Commitment pre-filter recall")
+    parser.add_argument("--transcripts", default="assets/transcript_{}.txt")
+    parser.add_argument("--results", default="result/test_results_*.txt")
+    parser.add_argument("--threshold", type=int, default=COMMITMENT_THRESHOLD)
+    parser.add_argument("--context", type=int, default=CONTEXT_LINES)
+    args = parser.parse_args()
+
+    totals = dict(items=0, kept_bare=0, kept_context=0, rules_found=0, chars=0, kept_chars=0)
+    for result_path in sorted(glob.glob(args.results)):
+        number = re.search(r"(\d+)", os.path.basename(result_path)).group(1)
+        with open(args.transcripts.format(number), "r", encoding="utf-8") as f:
+            lines = [line for line in f.read().splitlines() if line.strip()]
+        items = reference_items(result_path)
+
+        bare = set(select_candidate_lines(lines, args.threshold, context=0))
+        with_context = select_candidate_lines(lines, args.threshold, context=args.context)
+        rules = parse_action_items(extract_action_items_rules(lines, args.threshold))
+        tasks = [item["task"] for speaker_items in rules.values() for item in speaker_items]
+
+        matched = [best_line(item, lines) for item in items]
+        kept_bare = sum(i is not None and lines[i] in bare for i in matched)
+        kept_context = sum(i is not None and lines[i] in with_context for i in matched)
+        rules_found = sum(item_found(item, tasks) for item in items)
+        chars, kept_chars = len("\n".join(lines)), len("\n".join(with_context))
+
+        totals["items"] += len(items)
+        totals["kept_bare"] += kept_bare
+        totals["kept_context"] += kept_context
+        totals["rules_found"] += rules_found
+        totals["chars"] += chars
+        totals["kept_chars"] += kept_chars
+        print(
+            f"{result_path}: {len(with_context)}/{len(lines)} lines kept, "
+            f"line recall {kept_bare}/{len(items)} (cue lines) {kept_context}/{len(items)} (with context), "
+            f"rules-only {rules_found}/{len(items)}"
+        )
+
+    items = totals["items"] or 1
+    print(f"\nLine recall, cue lines only:  {totals['kept_bare'] / items:.0%}")
+    print(f"Line recall, with context:    {totals['kept_context'] / items:.0%}")
+    print(f"Prompt transcript kept:       {totals['kept_chars'] / (totals['chars'] or 1):.0%} of characters")
+    print(f"Rules-only item recall:       {totals['rules_found'] / items:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/concurrent_asr_diarization.py
+# Per-chunk wall-clock latency of Whisper + pyannote on the sample meetings: one after
+# the other with all cores, concurrently in two threads with partitioned torch thread
+# pools, and with diarization in a worker process. Needs HF_TOKEN for pyannote.
+#
+#   python -m benchmarks.concurrent_asr_diarization
+import argparse
+import glob
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+import whisper
+
+from modules.diarization import load_diarization_pipeline, diarize_chunk, DiarizationProcess
+from modules.stream_transcriber import (
+    transcribe_chunk, set_thread_torch_threads, ASR_THREADS, DIARIZATION_THREADS, CPU_COUNT
+)
+
+SAMPLERATE = 16000
+thread_counts = {}  # requested torch threads -> counts seen inside the benchmark threads
+
+
+def load_chunks(pattern, chunk_seconds):
+    chunks = []
+    for path in sorted(glob.glob(pattern)):
+        audio = whisper.audio.load_audio(path, sr=SAMPLERATE)  # mono float32
+        step = int(chunk_seconds * SAMPLERATE)
+        chunks.extend(audio[i:i + step] for i in range(0, len(audio) - step + 1, step))
+    return chunks
+
+
+def with_threads(num_threads, work):
+    def run(*args):
+        set_thread_torch_threads(num_threads)
+        result = work(*args)
+        # the count this thread ended up with, after the other thread set its own
+        thread_counts.setdefault(num_threads, set()).add(torch.get_num_threads())
+        return result
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs concurrent ASR + diarization latency")
+    parser.add_argument("--audio", default="assets/sample_meeting_*.wav")
+    parser.add_argument("--chunk-seconds", type=float, default=10)
+    parser.add_argument("--whisper", default="small")
+    args = parser.parse_args()
+
+    chunks = load_chunks(args.audio, args.chunk_seconds)
+    model = whisper.load_model(args.whisper)
+    pipeline = load_diarization_pipeline()
+    transcribe_chunk(model, chunks[0])  # warm-up
+    diarize_chunk(pipeline, chunks[0], SAMPLERATE)
+    print(f"{len(chunks)} chunks of {args.chunk_seconds:.0f}s, {CPU_COUNT} cores "
+          f"(ASR {ASR_THREADS} threads, diarization {DIARIZATION_THREADS} threads)\n")
+
+    torch.set_num_threads(CPU_COUNT)
+    start = time.perf_counter()
+    for audio in chunks:
+        transcribe_chunk(model, audio)
+        diarize_chunk(pipeline, audio, SAMPLERATE)
+    sequential = (time.perf_counter() - start) / len(chunks)
+    print(f"Sequential:                    {sequential:.2f}s per chunk")
+
+    asr = with_threads(ASR_THREADS, lambda audio: transcribe_chunk(model, audio))
+    diarize = with_threads(DIARIZATION_THREADS, lambda audio: diarize_chunk(pipeline, audio, SAMPLERATE))
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        start = time.perf_counter()
+        for audio in chunks:
+            segments, turns = pool.submit(asr, audio), pool.submit(diarize, audio)
+            segments.result(), turns.result()
+        threaded = (time.perf_counter() - start) / len(chunks)
+    print(f"Concurrent threads:            {threaded:.2f}s per chunk ({sequential / threaded:.2f}x)")
+    for requested, used in sorted(thread_counts.items()):
+        print(f"  torch threads requested {requested}, used {sorted(used)}")
+
+    worker = DiarizationProcess(DIARIZATION_THREADS)
+    try:
+        worker(chunks[0], SAMPLERATE)  # warm-up
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            start = time.perf_counter()
+            for audio in chunks:
+                segments, turns = pool.submit(asr, audio), pool.submit(worker, audio, SAMPLERATE)
+                segments.result(), turns.result()
+            process = (time.perf_counter() - start) / len(chunks)
+    finally:
+        worker.close()
+    print(f"Diarization in worker process: {process:.2f}s per chunk ({sequential / process:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
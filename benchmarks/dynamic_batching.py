@@ -0,0 +1,61 @@
+# benchmarks/dynamic_batching.py
+# Translation throughput through the inference daemon with 1, 2, 4, ... concurrent
+# users, each translating the sample transcript line by line. Start the daemon first:
+#
+#   python inference_server.py
+#   INFERENCE_SOCKET=inference.sock python -m benchmarks.dynamic_batching
+import argparse
+import glob
+import threading
+import time
+
+from modules import inference_client
+from modules.translator import split_speaker_prefix
+
+
+def load_lines(pattern):
+    lines = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            lines.extend(split_speaker_prefix(line)[1] for line in f if line.strip())
+    return lines
+
+
+def run_users(users, lines, tgt_lang):
+    def user(offset):
+        # every user sends different text so the translation memory doesn't answer for the model
+        for line in lines:
+            inference_client.translate_text(f"{line} ({offset})", src_lang="en", tgt_lang=tgt_lang)
+
+    threads = [threading.Thread(target=user, args=(f"{users}-{i}",)) for i in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return users * len(lines) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dynamic batching throughput of the inference daemon")
+    parser.add_argument("--transcripts", default="assets/transcript_*.txt")
+    parser.add_argument("--tgt-lang", default="fr")
+    parser.add_argument("--users", default="1,2,4,8")
+    args = parser.parse_args()
+
+    if not inference_client.INFERENCE_SOCKET:
+        raise SystemExit("Set INFERENCE_SOCKET to the socket of a running inference_server.py")
+    lines = load_lines(args.transcripts)
+    inference_client.translate_text("Warm up.", src_lang="en", tgt_lang=args.tgt_lang)
+
+    for users in [int(n) for n in args.users.split(",")]:
+        before = inference_client.get_server_stats()["translate"]
+        throughput = run_users(users, lines, args.tgt_lang)
+        after = inference_client.get_server_stats()["translate"]
+        batches = after["batches"] - before["batches"]
+        requests = after["requests"] - before["requests"]
+        print(f"{users:>3} users: {throughput:6.1f} lines/sec, mean batch size {requests / max(batches, 1):.1f}")
+
+
+if __name__ == "__main__":
+    main()
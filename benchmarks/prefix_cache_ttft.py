@@ -0,0 +1,77 @@
+# benchmarks/prefix_cache_ttft.py
+# Time-to-first-token of action item prompts with and without the reusable KV cache
+# of the fixed instruction header. Defaults to a small model that runs on CPU; pass
+# --model deepseek-ai/deepseek-llm-7b-chat for the real numbers.
+#
+#   python -m benchmarks.prefix_cache_ttft
+import argparse
+import glob
+import time
+
+import torch
+from transformers import AutoTokenizer, AutoModelForCausalLM
+
+from modules.ds_action_items import PROMPT_PREFIX, build_prompt, build_prompt_suffix
+from modules.prefix_cache import PrefixCache
+
+
+def time_first_token(generate):
+    start = time.perf_counter()
+    first_token = generate()
+    return time.perf_counter() - start, first_token
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefix KV-cache time-to-first-token")
+    parser.add_argument("--model", default="distilgpt2")
+    parser.add_argument("--transcripts", default="assets/transcript_*.txt")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForCausalLM.from_pretrained(args.model).eval()
+    cache = PrefixCache(PROMPT_PREFIX)
+    cache.get(tokenizer, model)
+    prefix_tokens = cache.get(tokenizer, model)[0].shape[1]
+    print(f"Instruction prefix: {prefix_tokens} tokens, prefilled once in {cache.prefill_time * 1000:.0f} ms\n")
+
+    def full_prompt(text):
+        input_ids = tokenizer(build_prompt(text), return_tensors="pt")["input_ids"]
+        with torch.no_grad():
+            output = model.generate(
+                input_ids,
+                attention_mask=torch.ones_like(input_ids),
+                max_new_tokens=1,
+                do_sample=False,
+                pad_token_id=tokenizer.eos_token_id,
+            )
+        return output[0, -1].item()
+
+    def cached_prompt(text):
+        return cache.generate(tokenizer, model, build_prompt_suffix(text), max_new_tokens=1, do_sample=False)[0].item()
+
+    total_full, total_cached, same = 0.0, 0.0, 0
+    paths = sorted(glob.glob(args.transcripts))
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read().strip()
+        full_times, cached_times = [], []
+        for _ in range(args.repeats):
+            elapsed, full_token = time_first_token(lambda: full_prompt(text))
+            full_times.append(elapsed)
+            elapsed, cached_token = time_first_token(lambda: cached_prompt(text))
+            cached_times.append(elapsed)
+        full_ttft, cached_ttft = min(full_times), min(cached_times)
+        total_full += full_ttft
+        total_cached += cached_ttft
+        same += full_token == cached_token
+        print(f"{path}: TTFT {full_ttft * 1000:.0f} ms -> {cached_ttft * 1000:.0f} ms "
+              f"(same first token: {full_token == cached_token})")
+
+    print(f"\nMean TTFT without prefix cache: {total_full / len(paths) * 1000:.0f} ms")
+    print(f"Mean TTFT with prefix cache:    {total_cached / len(paths) * 1000:.0f} ms")
+    print(f"Saving: {(1 - total_cached / total_full):.0%}, first tokens identical for {same}/{len(paths)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmarks/quantization_parity.py
+# Compare int8 dynamic quantization against fp32 for the summarizer and translator.
+#
+#   python -m benchmarks.quantization_parity --tgt-lang fr
+import argparse
+import gc
+import glob
+import os
+import time
+
+import torch
+
+from modules.quantization import model_size_mb
+from modules.summarizer import load_meeting_summarizer, summarize_with
+from modules.translator import load_translation_model
+
+
+def token_f1(reference, candidate):
+    ref, cand = reference.lower().split(), candidate.lower().split()
+    if not ref or not cand:
+        return float(ref == cand)
+    common = sum(min(ref.count(t), cand.count(t)) for t in set(cand))
+    if common == 0:
+        return 0.0
+    precision, recall = common / len(cand), common / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+
+def rss_mb():
+    # Current resident set size (Linux)
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def translate_lines(tokenizer, model, lines):
+    inputs = tokenizer(lines, return_tensors="pt", padding=True, truncation=True)
+    with torch.no_grad():
+        translated = model.generate(**inputs)
+    return tokenizer.batch_decode(translated, skip_special_tokens=True)
+
+
+def run(transcripts, tgt_lang):
+    report = {}
+    outputs = {}
+    for precision in ("fp32", "int8"):
+        gc.collect()
+        rss_before = rss_mb()
+        summ_tokenizer, summ_model = load_meeting_summarizer(precision)
+        mt_tokenizer, mt_model = load_translation_model("en", tgt_lang, precision)
+        resident = rss_mb() - rss_before
+        summary_time, translation_time = 0.0, 0.0
+        outputs[precision] = []
+        for lines in transcripts:
+            start = time.perf_counter()
+            summary = summarize_with(summ_tokenizer, summ_model, "\n".join(lines))
+            summary_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            translation = translate_lines(mt_tokenizer, mt_model, lines)
+            translation_time += time.perf_counter() - start
+            outputs[precision].append((summary, translation))
+        report[precision] = {
+            "summarizer_mb": model_size_mb(summ_model),
+            "translator_mb": model_size_mb(mt_model),
+            "summary_s": summary_time / len(transcripts),
+            "translation_s": translation_time / len(transcripts),
+            "resident_mb": resident,
+        }
+        del summ_model, mt_model
+
+    summary_f1, translation_f1, exact = [], [], []
+    for (ref_summary, ref_lines), (q_summary, q_lines) in zip(outputs["fp32"], outputs["int8"]):
+        summary_f1.append(token_f1(ref_summary, q_summary))
+        for ref, cand in zip(ref_lines, q_lines):
+            translation_f1.append(token_f1(ref, cand))
+            exact.append(ref == cand)
+    return report, {
+        "summary_token_f1": sum(summary_f1) / len(summary_f1),
+        "translation_token_f1": sum(translation_f1) / len(translation_f1),
+        "translation_exact_match": sum(exact) / len(exact),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="int8 vs fp32 parity and latency report")
+    parser.add_argument("--transcripts", default="assets/transcript_*.txt")
+    parser.add_argument("--tgt-lang", default="fr")
+    args = parser.parse_args()
+
+    transcripts = []
+    for path in sorted(glob.glob(args.transcripts)):
+        with open(path, "r", encoding="utf-8") as f:
+            transcripts.append([line.strip() for line in f if line.strip()])
+    if not transcripts:
+        raise SystemExit(f"No transcripts match {args.transcripts}")
+
+    report, parity = run(transcripts, args.tgt_lang)
+
+    print(f"\n=== Latency / memory ({len(transcripts)} transcripts, en-{args.tgt_lang}) ===")
+    print(f"{'':<8}{'summ MB':>10}{'mt MB':>10}{'summ s':>10}{'mt s':>10}{'RSS MB':>10}")
+    for precision, r in report.items():
+        print(
+            f"{precision:<8}{r['summarizer_mb']:>10.1f}{r['translator_mb']:>10.1f}"
+            f"{r['summary_s']:>10.2f}{r['translation_s']:>10.2f}{r['resident_mb']:>10.1f}"
+        )
+    fp32, int8 = report["fp32"], report["int8"]
+    print(f"\nSummary speed-up:     x{fp32['summary_s'] / int8['summary_s']:.2f}")
+    print(f"Translation speed-up: x{fp32['translation_s'] / int8['translation_s']:.2f}")
+
+    print("\n=== Parity (int8 vs fp32) ===")
+    for name, value in parity.items():
+        print(f"{name:<26}{value:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/speaker_alignment.py
+# Segment-to-speaker alignment on synthetic multi-hour meetings: the old nested scan
+# (first overlapping turn) against the sweep and the vectorized max-overlap aligners.
+# Every meeting also has one background turn spanning all of it (music, a speakerphone
+# hum diarized as a speaker), which must not make either aligner quadratic.
+# No models needed.
+#
+#   python -m benchmarks.speaker_alignment --hours 1 3 6
+import argparse
+import random
+import time
+import tracemalloc
+
+from modules.speaker_alignment import _match_sweep, _match_vectorized
+
+
+def synthetic_meeting(hours, speakers, seed):
+    # Short diarization turns (some overlapping speech) and longer Whisper segments
+    rng = random.Random(seed)
+    duration = hours * 3600
+    turns, t = [], 0.0
+    while t < duration:
+        length = rng.uniform(0.3, 6.0)
+        turns.append({"speaker": f"SPEAKER_{rng.randrange(speakers):02d}", "start": t, "end": t + length})
+        t += length - (rng.uniform(0, 0.5) if rng.random() < 0.2 else -rng.uniform(0, 0.3))
+    segments, t = [], 0.0
+    while t < duration:
+        length = rng.uniform(1.0, 12.0)
+        segments.append({"start": t, "end": t + length, "text": ""})
+        t += length
+    turns.insert(len(turns) // 3, {"speaker": "BACKGROUND", "start": 60.0, "end": duration})
+    return segments, turns
+
+
+def first_overlap(segments, turns):
+    # what assign_speakers used to do
+    speakers = []
+    for seg in segments:
+        matched = None
+        for turn in turns:
+            if turn["start"] <= seg["end"] and turn["end"] >= seg["start"]:
+                matched = turn["speaker"]
+                break
+        speakers.append(matched)
+    return speakers
+
+
+def timed(fn, *args):
+    # (result, seconds, peak MB allocated)
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speaker alignment micro-benchmark")
+    parser.add_argument("--hours", type=float, nargs="+", default=[1, 3, 6])
+    parser.add_argument("--speakers", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'hours':>5} {'segments':>8} {'turns':>6} {'nested':>9} {'sweep':>9} {'numpy':>9} "
+          f"{'numpy MB':>8} {'relabeled':>9}")
+    for hours in args.hours:
+        segments, turns = synthetic_meeting(hours, args.speakers, args.seed)
+        old, nested, _ = timed(first_overlap, segments, turns)
+        swept, sweep, _ = timed(_match_sweep, segments, turns)
+        vectorized, numpy_time, numpy_mb = timed(_match_vectorized, segments, turns)
+        assert swept == vectorized, "sweep and vectorized aligners disagree"
+        # segments whose speaker changes now that the longest overlap wins
+        changed = sum(a != b for a, b in zip(old, swept)) / len(segments)
+        print(f"{hours:>5g} {len(segments):>8} {len(turns):>6} {nested:>8.3f}s {sweep:>8.3f}s "
+              f"{numpy_time:>8.3f}s {numpy_mb:>8.1f} {changed:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/speculative_decoding.py
+# Check that speculative decoding reproduces plain greedy decoding and report the
+# draft acceptance rate and speed. Defaults are small enough to run on CPU; pass
+# --target deepseek-ai/deepseek-llm-7b-chat --draft <model> for the real setup.
+#
+#   python -m benchmarks.speculative_decoding
+import argparse
+import glob
+import time
+
+import torch
+from transformers import AutoTokenizer, AutoModelForCausalLM
+
+from modules.ds_action_items import build_prompt
+from modules.speculative import speculative_generate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speculative vs greedy decoding")
+    parser.add_argument("--target", default="distilgpt2")
+    parser.add_argument("--draft", default="sshleifer/tiny-gpt2")
+    parser.add_argument("--transcripts", default="assets/transcript_*.txt")
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--draft-tokens", type=int, default=4)
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.target)
+    target = AutoModelForCausalLM.from_pretrained(args.target).eval()
+    draft = AutoModelForCausalLM.from_pretrained(args.draft).eval()
+
+    greedy_time, speculative_time, proposed, accepted, tokens = 0.0, 0.0, 0, 0, 0
+    for path in sorted(glob.glob(args.transcripts)):
+        with open(path, "r", encoding="utf-8") as f:
+            prompt = build_prompt(f.read().strip())
+        input_ids = tokenizer(prompt, return_tensors="pt")["input_ids"]
+
+        start = time.perf_counter()
+        with torch.no_grad():
+            greedy = target.generate(
+                input_ids,
+                attention_mask=torch.ones_like(input_ids),
+                max_new_tokens=args.max_new_tokens,
+                do_sample=False,
+                pad_token_id=tokenizer.eos_token_id,
+            )
+        greedy_time += time.perf_counter() - start
+
+        speculative, stats = speculative_generate(
+            target, draft, input_ids, args.max_new_tokens,
+            num_draft_tokens=args.draft_tokens, eos_token_id=tokenizer.eos_token_id,
+        )
+        speculative_time += stats["seconds"]
+        proposed += stats["proposed"]
+        accepted += stats["accepted"]
+        tokens += stats["new_tokens"]
+
+        identical = torch.equal(greedy, speculative)
+        print(f"{path}: identical={identical} acceptance={stats['acceptance_rate']:.0%} "
+              f"target passes={stats['target_passes']} for {stats['new_tokens']} tokens")
+        if not identical:
+            raise SystemExit("❌ Speculative output differs from greedy decoding")
+
+    print(f"\nAcceptance rate: {accepted / proposed if proposed else 0:.0%}")
+    print(f"Greedy:      {tokens / greedy_time:.1f} tokens/sec")
+    print(f"Speculative: {tokens / speculative_time:.1f} tokens/sec")
+
+
+if __name__ == "__main__":
+    main()
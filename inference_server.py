@@ -0,0 +1,109 @@
+# inference_server.py
+# Local inference daemon: loads the translation, summary and action item models once
+# and serves every app / worker process over a Unix socket (newline-delimited JSON).
+# Concurrent requests are coalesced into dynamic batches (modules/dynamic_batcher.py),
+# so throughput grows with the number of users instead of serialising them.
+#
+#   python inference_server.py
+#   INFERENCE_SOCKET=inference.sock streamlit run online_app.py
+import argparse
+import json
+import os
+import socketserver
+
+from modules.inference_client import INFERENCE_SOCKET, DEFAULT_SOCKET
+from modules.dynamic_batcher import DynamicBatcher
+from modules.translator import translate_batch, preload_translation_models
+from modules.summarizer import generate_summaries
+from modules.ds_action_items import extract_action_items_with_deepseek
+from modules.model_provider import WARM_UP_MODELS, start_warm_up
+
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "16"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "20"))
+SUMMARY_BATCH_MAX_SIZE = int(os.getenv("SUMMARY_BATCH_MAX_SIZE", "4"))
+
+
+def run_translation_batch(key, texts):
+    src_lang, tgt_lang = key
+    unique = list(dict.fromkeys(texts))  # users often send the same text
+    translated = dict(zip(unique, translate_batch(unique, src_lang, tgt_lang)))
+    return [translated[text] for text in texts]
+
+
+def run_summary_batch(key, texts):
+    profile, latency_budget = key
+    return generate_summaries(texts, profile=profile, latency_budget=latency_budget)
+
+
+def run_action_items(key, transcripts):
+    # the 7B model takes one transcript at a time; the batcher just serialises them
+    profile, latency_budget = key
+    return [
+        extract_action_items_with_deepseek(lines, profile=profile, latency_budget=latency_budget)
+        for lines in transcripts
+    ]
+
+
+max_wait = BATCH_MAX_WAIT_MS / 1000
+batchers = {
+    "translate": DynamicBatcher("translate", run_translation_batch, BATCH_MAX_SIZE, max_wait),
+    "summarize": DynamicBatcher("summarize", run_summary_batch, SUMMARY_BATCH_MAX_SIZE, max_wait),
+    "action_items": DynamicBatcher("action_items", run_action_items, 1, 0),
+}
+
+
+def handle(op, args):
+    if op == "translate":
+        key = (args["src_lang"], args["tgt_lang"])
+        futures = [batchers["translate"].submit(key, text) for text in args["texts"]]
+        return [future.result() for future in futures]
+    if op == "summarize":
+        key = (args.get("profile"), args.get("latency_budget"))
+        return batchers["summarize"].submit(key, args["text"]).result()
+    if op == "action_items":
+        key = (args.get("profile"), args.get("latency_budget"))
+        return batchers["action_items"].submit(key, args["transcript_lines"]).result()
+    if op == "stats":
+        return {name: batcher.stats() for name, batcher in batchers.items()}
+    raise ValueError(f"Unknown operation '{op}'")
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    # One thread per client connection; each line is a request, answered in order
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = {"result": handle(request["op"], request.get("args", {}))}
+            except Exception as e:
+                response = {"error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class InferenceServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local inference daemon with dynamic batching")
+    parser.add_argument("--socket", default=INFERENCE_SOCKET or DEFAULT_SOCKET)
+    parser.add_argument("--preload-languages", default="", help="comma separated, e.g. fr,de,zh")
+    args = parser.parse_args()
+
+    if WARM_UP_MODELS:
+        start_warm_up()
+    if args.preload_languages:
+        preload_translation_models(args.preload_languages.split(","))
+    if os.path.exists(args.socket):
+        os.remove(args.socket)  # left over from a previous run
+    with InferenceServer(args.socket, RequestHandler) as server:
+        print(f"🧠 Inference server listening on {args.socket}")
+        try:
+            server.serve_forever()
+        finally:
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# job_worker.py
+# Runs the summary / action item jobs that online_app.py queues (modules/job_queue.py).
+# Start one next to the app:
+#
+#   python job_worker.py
+#
+# The models load once in this process (or in inference_server.py when INFERENCE_SOCKET
+# is set, so several workers share them); the app itself never generates.
+import argparse
+import os
+import socket
+import threading
+import time
+
+from modules.job_queue import JOB_HEARTBEAT_INTERVAL, claim_next, complete, fail, heartbeat
+from modules.chatroom_db import get_chatroom_transcript, update_chatroom_summary, update_chatroom_action_item
+from modules.model_provider import WARM_UP_MODELS, start_warm_up
+from modules import inference_client
+from modules.generation_profiles import SUMMARY_LATENCY_BUDGET, ACTION_ITEMS_LATENCY_BUDGET
+
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+
+
+def generate_job(job):
+    # In the daemon (INFERENCE_SOCKET) or in this process, with the same full-quality
+    # generation either way, so the saved result doesn't depend on where it ran
+    text = get_chatroom_transcript(job["chatroom_name"])
+    if job["kind"] == "summary":
+        return inference_client.generate_summary(text, latency_budget=SUMMARY_LATENCY_BUDGET)
+    return inference_client.extract_action_items_with_deepseek(text, latency_budget=ACTION_ITEMS_LATENCY_BUDGET)
+
+
+def run_job(job):
+    output = generate_job(job).strip()
+    if job["kind"] == "summary":
+        update_chatroom_summary(job["chatroom_name"], job["language"], output)
+    else:
+        update_chatroom_action_item(job["chatroom_name"], job["language"], output)
+
+
+def run_with_heartbeat(job):
+    # Generation can run for many minutes without output; the heartbeat thread keeps
+    # the job claimed so another worker doesn't start it a second time
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(JOB_HEARTBEAT_INTERVAL):
+            try:
+                if not heartbeat(job["id"], job["worker"]):
+                    print(f"⚠️ Job {job['id']} was handed to another worker or given up on")
+                    return
+            except Exception as e:
+                print(f"⚠️ Heartbeat of job {job['id']} failed: {e}")
+
+    thread = threading.Thread(target=beat, name=f"job-{job['id']}-heartbeat", daemon=True)
+    thread.start()
+    try:
+        run_job(job)
+    finally:
+        stop.set()
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Background worker for online_app summary / action item jobs")
+    parser.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    args = parser.parse_args()
+
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    if WARM_UP_MODELS and not inference_client.INFERENCE_SOCKET:
+        start_warm_up()
+    print(f"👷 Job worker {worker} waiting for jobs")
+    while True:
+        job = claim_next(worker)
+        if job is None:
+            if args.once:
+                break
+            time.sleep(JOB_POLL_INTERVAL)
+            continue
+        print(f"▶️ Job {job['id']}: {job['kind']} for '{job['chatroom_name']}' (attempt {job['attempts']})")
+        start = time.perf_counter()
+        try:
+            run_with_heartbeat(job)
+        except Exception as e:
+            print(f"❌ Job {job['id']} failed: {e}")
+            fail(job["id"], worker, e)
+        else:
+            if complete(job["id"], worker):
+                print(f"✅ Job {job['id']} done in {time.perf_counter() - start:.1f}s")
+            else:
+                print(f"⚠️ Job {job['id']} finished after it was handed to another worker or given up on")
+
+
+if __name__ == "__main__":
+    main()
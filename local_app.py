@@ -1,19 +1,44 @@
 # app.py
 import streamlit as st
-from modules.stream_transcriber import stream_transcribe_live
-from modules.summarizer import generate_summary
-from modules.translator import translate_text
-from modules.ds_action_items import extract_action_items_with_deepseek
+from modules.stream_transcriber import stream_transcribe_live, live_pipeline_metrics
+from modules.summarizer import generate_summary, stream_summary, summary_streams, RollingSummarizer
+from modules.translator import translate_transcript
+from modules.ds_action_items import stream_action_items
+from modules.action_items_config import action_items_available
+from modules.model_provider import WARM_UP_MODELS, start_warm_up, get_model_status
+from modules.generation_profiles import SUMMARY_LATENCY_BUDGET, ACTION_ITEMS_LATENCY_BUDGET, select_profile
 
 st.set_page_config(page_title="Smart Meeting Assistant")
 st.sidebar.title("🧠 Smart Meeting Assistant")
 
+
+# Start loading models in the background once per process; the UI stays usable meanwhile
+@st.cache_resource
+def warm_up_models():
+    return start_warm_up()
+
+
+if WARM_UP_MODELS:
+    warm_up_models()
+
+model_status_icons = {"ready": "✅", "loading": "⏳", "not loaded": "💤", "disabled": "⛔", "failed": "❌"}
+with st.sidebar.expander("⚙️ Models"):
+    model_status = get_model_status()
+    enabled = [m for m in model_status if m["status"] != "disabled"]
+    if enabled:
+        st.progress(sum(m["status"] == "ready" for m in enabled) / len(enabled))
+    for m in model_status:
+        load_time = f" ({m['load_time']:.1f}s)" if m["load_time"] else ""
+        st.write(f"{model_status_icons[m['status']]} {m['name']}: {m['status']}{load_time}")
+
 uploaded_file = st.sidebar.file_uploader("📤 Upload a .txt transcript", type="txt")
 
 # Load transcript into session if uploaded
 if uploaded_file:
     transcript_text = uploaded_file.read().decode("utf-8")
     st.session_state.transcript = transcript_text.strip().split("\n")
+    st.session_state.rolling_summarizer = None  # live summary no longer matches
+    st.session_state.speaker_names = []
     st.sidebar.success("Transcript uploaded and ready to use.")
 
 app_mode = st.sidebar.radio("Choose an option:", [
@@ -29,6 +54,10 @@ if "is_recording" not in st.session_state:
     st.session_state.is_recording = False
 if "transcript" not in st.session_state:
     st.session_state.transcript = []
+if "rolling_summarizer" not in st.session_state:
+    st.session_state.rolling_summarizer = None
+if "speaker_names" not in st.session_state:
+    st.session_state.speaker_names = []  # names given in the rename step
 
 if app_mode == "Live Transcription":
     st.header("🎤 Real-time Speaker-Aware Transcription")
@@ -38,21 +67,44 @@ if app_mode == "Live Transcription":
         if st.button("▶️ Start Transcription"):
             st.session_state.is_recording = True
             st.session_state.transcript = []  
+            st.session_state.rolling_summarizer = RollingSummarizer()
             st.session_state.has_renamed = False  # ✅ Reset renaming flag
+            st.session_state.speaker_names = []
     with col2:
         if st.button("🛑 Stop Transcription"):
             st.session_state.is_recording = False
 
 
+    summary_box = st.empty()
     transcript_box = st.empty()
+    metrics_box = st.empty()
+
+    if st.session_state.rolling_summarizer and st.session_state.rolling_summarizer.summary:
+        summary_box.markdown("**🧠 Live Summary:**\n\n" + st.session_state.rolling_summarizer.summary)
 
     if st.session_state.is_recording:
         st.info("Recording started. Speak into your mic...")
+        if st.session_state.rolling_summarizer is None:
+            st.session_state.rolling_summarizer = RollingSummarizer()
         for labeled_lines in stream_transcribe_live():
             if not st.session_state.is_recording:
                 break
             st.session_state.transcript.extend(labeled_lines)
             transcript_box.markdown("**📝 Transcript:**\n\n" + "\n\n".join(st.session_state.transcript))
+            queues = live_pipeline_metrics["queues"]
+            metrics_box.caption(
+                f"⏱️ Latency {live_pipeline_metrics['last_latency']:.1f}s · "
+                + " · ".join(f"{name} {queues[name]['depth']}/{queues[name]['size']}" for name in ("asr", "diarization"))
+                + f" · dropped {live_pipeline_metrics['dropped_chunks']} chunks"
+                + (f" · skipped {live_pipeline_metrics['skipped_silence_seconds']:.0f}s of silence"
+                   if "skipped_silence_seconds" in live_pipeline_metrics else "")
+                + (f" · Whisper {live_pipeline_metrics['whisper_tier']}, RTF {live_pipeline_metrics['asr_rtf']:.2f}"
+                   if "whisper_tier" in live_pipeline_metrics else "")
+            )
+            # updates in the background; shows the latest finished summary
+            live_summary = st.session_state.rolling_summarizer.add_chunk(labeled_lines)
+            if live_summary:
+                summary_box.markdown("**🧠 Live Summary:**\n\n" + live_summary)
         st.success("Recording stopped.")
 
     if st.session_state.transcript:
@@ -107,6 +159,7 @@ if app_mode == "Live Transcription":
                 )
                 st.session_state.transcript = renamed_transcript
                 st.session_state.has_renamed = True  # prevent showing rename inputs again
+                st.session_state.speaker_names = [name[:-1] for name in speaker_name_map.values()]
                 st.success("Speaker names updated!")
                 st.markdown("**📝 Renamed Transcript:**")
                 st.markdown("\n\n".join(st.session_state.transcript))
@@ -117,12 +170,33 @@ elif app_mode == "Summarize Transcript":
 
     if st.session_state.transcript:
         st.text_area("Transcript", value="\n".join(st.session_state.transcript), height=200, key="summarize_transcript_area")
-        if st.button("🧠 Generate Summary"):
-            with st.spinner("Summarizing..."):
-                text = "\n".join(st.session_state.transcript)
-                summary = generate_summary(text)
+        rolling = st.session_state.rolling_summarizer
+        col1, col2 = st.columns(2)
+        with col1:
+            fast_preview = st.button("⚡ Fast Preview", key="summary_fast_preview")
+        with col2:
+            full_summary = st.button("🧠 Generate Summary")
+        # greedy summaries are rendered token by token as they decode
+        if fast_preview:
+            st.subheader("📝 Summary (fast preview)")
+            st.write_stream(stream_summary("\n".join(st.session_state.transcript), profile="fast"))
+        if full_summary:
             st.subheader("📝 Summary")
-            st.markdown(summary)
+            if rolling and rolling.covers(st.session_state.transcript):
+                # the live summary already covers everything but the last few chunks
+                with st.spinner("Summarizing..."):
+                    summary = rolling.flush()
+                st.markdown(summary)
+            else:
+                text = "\n".join(st.session_state.transcript)
+                profile = select_profile("summary", SUMMARY_LATENCY_BUDGET)
+                if summary_streams(profile):
+                    st.write_stream(stream_summary(text, profile=profile))
+                else:
+                    # beam search only has its summary at the end
+                    with st.spinner("Summarizing..."):
+                        summary = generate_summary(text, profile=profile)
+                    st.markdown(summary)
     else:
         st.warning("❗ No transcript found. Please record or upload one first.")
 
@@ -146,10 +220,12 @@ elif app_mode == "Translate Transcript":
         target_lang = st.selectbox("Select target language:", list(supported_languages.keys()))
         if st.button("🌍 Translate"):
             with st.spinner("Translating transcript..."):
-                full_text = "\n".join(st.session_state.transcript)
-                translated = translate_text(full_text, src_lang="en", tgt_lang=supported_languages[target_lang])
+                translated_lines = translate_transcript(
+                    st.session_state.transcript, src_lang="en", tgt_lang=supported_languages[target_lang],
+                    speaker_names=st.session_state.speaker_names,
+                )
             st.subheader(f"📄 Translation ({target_lang})")
-            st.markdown(translated)
+            st.markdown("\n\n".join(translated_lines))
     else:
         st.warning("❗ No transcript found. Please record or upload one first.")
 
@@ -157,12 +233,22 @@ elif app_mode == "Action Items (DeepSeek)":
     st.header("🐋 DeepSeek Action Item Extraction")
     st.markdown("Automatically extract actionable items and tasks from your meeting transcript.")
     st.text_area("Transcript", value="\n".join(st.session_state.transcript), height=200, key="action_items_transcript_area")
-    if st.session_state.transcript:
-        if st.button("🐋 Extract with DeepSeek"):
-            with st.spinner("Analyzing transcript with DeepSeek..."):
-                full_text = extract_action_items_with_deepseek(st.session_state.transcript)
+    if not action_items_available():
+        st.warning("❗ Action item extraction is disabled on this node (ENABLE_ACTION_ITEMS=false).")
+    elif st.session_state.transcript:
+        col1, col2 = st.columns(2)
+        with col1:
+            fast_preview = st.button("⚡ Fast Preview", key="action_items_fast_preview")
+        with col2:
+            full_extract = st.button("🐋 Extract with DeepSeek")
+        if fast_preview:
+            st.subheader("📋 Action Items (fast preview)")
+            st.write_stream(stream_action_items(st.session_state.transcript, profile="fast"))
+        if full_extract:
             st.subheader("📋 Action Items")
-            st.markdown(full_text)
+            st.write_stream(
+                stream_action_items(st.session_state.transcript, latency_budget=ACTION_ITEMS_LATENCY_BUDGET)
+            )
     else:
         st.warning("❗ No transcript found. Please record or upload one first.")
 
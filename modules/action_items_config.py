@@ -0,0 +1,17 @@
+# modules/action_items_config.py
+# Action item settings without the model code, so thin clients (online_app.py with
+# INFERENCE_SOCKET) can check them without importing torch / transformers
+import os
+
+# Nodes that don't serve action items can skip the 7B model entirely
+ACTION_ITEMS_ENABLED = os.getenv("ENABLE_ACTION_ITEMS", "true").lower() == "true"
+# "llm": whole transcript to DeepSeek; "prefilter": only lines with commitment cues
+# (plus context) go to DeepSeek; "rules": rule-based extraction, no LLM loaded
+ACTION_ITEMS_MODE = os.getenv("ACTION_ITEMS_MODE", "prefilter").lower()
+if ACTION_ITEMS_MODE not in ("llm", "prefilter", "rules"):
+    raise ValueError(f"Unknown ACTION_ITEMS_MODE '{ACTION_ITEMS_MODE}', use llm, prefilter or rules")
+
+
+def action_items_available():
+    # the rules-only mode needs no model, so only ENABLE_ACTION_ITEMS turns the feature off
+    return ACTION_ITEMS_ENABLED
@@ -0,0 +1,70 @@
+# modules/action_items_format.py
+# Parsing, merging and rendering of "Speaker / Task / Due" action item lists,
+# shared by the DeepSeek extractor and the rule-based extractor
+import re
+from difflib import SequenceMatcher
+
+DUPLICATE_TASK_SIMILARITY = 0.85
+
+
+def _clean(value):
+    return value.replace("*", "").strip().strip("[]").strip()
+
+
+def parse_action_items(text):
+    # "Speaker: X / - Task: ... / Due: ..." -> {speaker: [{"task": ..., "due": ...}]}
+    grouped, speaker = {}, None
+    for raw_line in text.splitlines():
+        line = _clean(raw_line)
+        speaker_match = re.match(r"^speaker\s*:\s*(.+)$", line, re.IGNORECASE)
+        task_match = re.match(r"^[-•]?\s*task\s*:\s*(.+)$", line, re.IGNORECASE)
+        due_match = re.match(r"^due\s*:\s*(.*)$", line, re.IGNORECASE)
+        if speaker_match:
+            speaker = _clean(speaker_match.group(1)).rstrip(":")
+            grouped.setdefault(speaker, [])
+        elif task_match and speaker is not None:
+            grouped[speaker].append({"task": _clean(task_match.group(1)), "due": ""})
+        elif due_match and speaker is not None and grouped[speaker]:
+            grouped[speaker][-1]["due"] = _clean(due_match.group(1))
+    return grouped
+
+
+def normalize_task(task):
+    return " ".join(re.sub(r"[^a-z0-9 ]", " ", task.lower()).split())
+
+
+def has_due(due):
+    return bool(due) and due.lower() not in ("not mentioned", "none", "n/a", "due date if mentioned")
+
+
+def merge_action_items(grouped, new_items):
+    # Overlapping windows report the same commitment twice; keep one, preferring a due date
+    for speaker, items in new_items.items():
+        existing = grouped.setdefault(speaker, [])
+        for item in items:
+            task_key = normalize_task(item["task"])
+            if not task_key:
+                continue
+            duplicate = next(
+                (e for e in existing
+                 if SequenceMatcher(None, normalize_task(e["task"]), task_key).ratio() >= DUPLICATE_TASK_SIMILARITY),
+                None,
+            )
+            if duplicate is None:
+                existing.append(dict(item))
+            elif not has_due(duplicate["due"]) and has_due(item["due"]):
+                duplicate["due"] = item["due"]
+    return grouped
+
+
+def format_action_items(grouped):
+    blocks = []
+    for speaker, items in grouped.items():
+        if not items:
+            continue
+        lines = [f"Speaker: {speaker}"]
+        for item in items:
+            lines.append(f"- Task: {item['task']}")
+            lines.append(f"  Due: {item['due'] if has_due(item['due']) else 'Not mentioned'}")
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
@@ -0,0 +1,55 @@
+# modules/audio_buffer.py
+# Preallocated float32 ring buffer between the sounddevice callback and the
+# transcription loop. The callback copies each block straight into the buffer (no list
+# of small arrays); the loop gets every chunk as a view into the buffer, which Whisper
+# and pyannote take without another copy.
+import threading
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    # Capacity is a whole number of chunks and chunks are read at multiples of
+    # chunk_samples, so a chunk never wraps around the end and is always contiguous.
+    # A chunk stays valid until the next read_chunk() call; until then the writer
+    # doesn't touch it and drops incoming audio instead if the buffer is full.
+    def __init__(self, chunk_samples, chunks=3):
+        if chunks < 2:
+            raise ValueError("The ring buffer needs room for at least 2 chunks")
+        self.chunk_samples = chunk_samples
+        self.capacity = chunk_samples * chunks
+        self.buffer = np.zeros(self.capacity, dtype=np.float32)
+        self.written = 0   # total samples written
+        self.consumed = 0  # total samples released by the reader
+        self.dropped = 0   # samples lost because the reader fell behind
+        self._reading = 0  # start of the chunk the reader currently holds
+        self._ready = threading.Condition()
+
+    def write(self, samples):
+        # Called from the audio callback with a 1-D float32 block
+        with self._ready:
+            free = self.capacity - (self.written - self.consumed)
+            if len(samples) > free:
+                self.dropped += len(samples) - free
+                samples = samples[:free]
+            start = self.written % self.capacity
+            first = min(len(samples), self.capacity - start)
+            self.buffer[start:start + first] = samples[:first]
+            self.buffer[:len(samples) - first] = samples[first:]
+            self.written += len(samples)
+            self._ready.notify()
+
+    def read_chunk(self, timeout=None):
+        # Blocks until a full chunk is available; returns a view (don't modify it), or None on timeout
+        with self._ready:
+            self.consumed = self._reading  # the previous chunk is no longer in use
+            end = self._reading + self.chunk_samples
+            if not self._ready.wait_for(lambda: self.written >= end, timeout):
+                return None
+            start = self._reading % self.capacity
+            self._reading = end
+        return self.buffer[start:start + self.chunk_samples]
+
+    def callback(self, indata, frames, time, status):
+        # sounddevice InputStream callback for a mono float32 stream
+        self.write(indata[:, 0])
@@ -0,0 +1,183 @@
+# modules/chatroom_db.py
+# Chatroom database access shared by online_app.py and the background job worker
+# (job_worker.py), which writes summaries / action items from another process.
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# goes through the inference daemon when INFERENCE_SOCKET is set
+from modules.inference_client import translate_text
+from modules.translation_memory import text_hash
+
+_fanout_executor = None
+_fanout_lock = threading.Lock()
+
+
+# Worker pool shared by all sessions of this process that precomputes translations at write time
+def get_fanout_executor():
+    global _fanout_executor
+    with _fanout_lock:
+        if _fanout_executor is None:
+            _fanout_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("TRANSLATION_FANOUT_WORKERS", "2")),
+                thread_name_prefix="translation-fanout",
+            )
+        return _fanout_executor
+
+
+def get_chatroom_member_languages(chatroom_name):
+    conn = sqlite3.connect("chatroom.db")
+    c = conn.cursor()
+    c.execute(
+        """SELECT DISTINCT users.language FROM chatroom_members
+           JOIN chatrooms ON chatrooms.id = chatroom_members.chatroom_id
+           JOIN users ON users.username = chatroom_members.username
+           WHERE chatrooms.name = ?""",
+        (chatroom_name,),
+    )
+    languages = [row[0] for row in c.fetchall()]
+    conn.close()
+    return languages
+
+
+def save_translation(source_type, source_id, language, source_text, content):
+    conn = sqlite3.connect("chatroom.db", timeout=30)
+    c = conn.cursor()
+    c.execute(
+        "INSERT OR REPLACE INTO translations (source_type, source_id, language, source_hash, content) VALUES (?, ?, ?, ?, ?)",
+        (source_type, source_id, language, text_hash(source_text), content),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_translation(source_type, source_id, language, source_text):
+    # source_text guards against translations of a summary that was regenerated since
+    conn = sqlite3.connect("chatroom.db")
+    c = conn.cursor()
+    c.execute(
+        "SELECT content FROM translations WHERE source_type = ? AND source_id = ? AND language = ? AND source_hash = ?",
+        (source_type, source_id, language, text_hash(source_text)),
+    )
+    translation = c.fetchone()
+    conn.close()
+    return translation[0] if translation else None
+
+
+def translate_and_save(source_type, source_id, text, src_lang, tgt_lang):
+    try:
+        content = translate_text(text, src_lang=src_lang, tgt_lang=tgt_lang)
+        save_translation(source_type, source_id, tgt_lang, text, content)
+    except Exception as e:
+        print(f"⚠️ Translation fan-out failed for {source_type} {source_id} ({tgt_lang}): {e}")
+
+
+# Precompute translations of newly written content for every member language
+# in the background, so readers only have to select their own language
+def fan_out_translations(chatroom_name, source_type, source_id, text, src_lang, skip_languages=()):
+    executor = get_fanout_executor()
+    for language in get_chatroom_member_languages(chatroom_name):
+        if language == src_lang or language in skip_languages:
+            continue
+        executor.submit(translate_and_save, source_type, source_id, text, src_lang, language)
+
+
+# Messages come with the precomputed translation for `language` (None if not ready yet)
+def get_messages(chatroom_name, language=None):
+    conn = sqlite3.connect("chatroom.db")
+    c = conn.cursor()
+    c.execute("SELECT id FROM chatrooms WHERE name = ?", (chatroom_name,))
+    chatroom = c.fetchone()
+    if chatroom:
+        chatroom_id = chatroom[0]
+        c.execute(
+            """SELECT m.username, m.message, m.language, m.translated_message, m.translated_language, m.timestamp, t.content
+               FROM messages m
+               LEFT JOIN translations t
+                 ON t.source_type = 'message' AND t.source_id = m.id AND t.language = ?
+               WHERE m.chatroom_id = ? ORDER BY m.timestamp ASC""",
+            (language, chatroom_id),
+        )
+        messages = c.fetchall()
+    else:
+        messages = []
+    conn.close()
+    return messages
+
+
+def update_chatroom_summary(chatroom_name, languages, summary):
+    conn = sqlite3.connect("chatroom.db")
+    c = conn.cursor()
+    c.execute("SELECT id FROM chatrooms WHERE name = ?", (chatroom_name,))
+    chatroom = c.fetchone()
+    if chatroom:
+        chatroom_id = chatroom[0]
+
+        c.execute(
+            "SELECT id FROM chatrooms_summary WHERE chatroom_id = ?",
+            (chatroom_id,),
+        )
+        chatrooms_summary = c.fetchone()
+        if chatrooms_summary:
+            c.execute(
+                "UPDATE chatrooms_summary SET summary = ? WHERE chatroom_id = ?",
+                (summary, chatroom_id),
+            )
+        else:
+            c.execute(
+                "INSERT INTO chatrooms_summary (chatroom_id, summary, languages) VALUES (?, ?, ?)",
+                (chatroom_id, summary, languages),
+            )
+        conn.commit()
+        fan_out_translations(chatroom_name, "summary", chatroom_id, summary, languages)
+    conn.close()
+
+
+def update_chatroom_action_item(chatroom_name, languages, action_item):
+    conn = sqlite3.connect("chatroom.db")
+    c = conn.cursor()
+    c.execute("SELECT id FROM chatrooms WHERE name = ?", (chatroom_name,))
+    chatroom = c.fetchone()
+    if chatroom:
+        chatroom_id = chatroom[0]
+
+        c.execute(
+            "SELECT id FROM chatrooms_summary WHERE chatroom_id = ?",
+            (chatroom_id,),
+        )
+        chatrooms_summary = c.fetchone()
+        if chatrooms_summary:
+            c.execute(
+                "UPDATE chatrooms_summary SET action_item = ? WHERE chatroom_id = ?",
+                (action_item, chatroom_id),
+            )
+        else:
+            c.execute(
+                "INSERT INTO chatrooms_summary (chatroom_id, action_item, languages) VALUES (?, ?, ?)",
+                (chatroom_id, action_item, languages),
+            )
+        conn.commit()
+        fan_out_translations(chatroom_name, "action_item", chatroom_id, action_item, languages)
+    conn.close()
+
+
+# format message to a specific format - pass to summarizar / deepseek for extract action item
+def format_message(user_name, message):
+    return user_name + " : " + message + "\n"
+
+
+# The meeting as "user : message" lines in the default language, as fed to the summarizer / DeepSeek
+def get_chatroom_transcript(chatroom_name):
+    text = ""
+    for (
+        user,
+        msg,
+        lang,
+        translated_msg,
+        translated_lang,
+        timestamp,
+        fanned_out,
+    ) in get_messages(chatroom_name):
+        text += format_message(user, translated_msg)
+    return text
@@ -0,0 +1,126 @@
+# modules/commitment_filter.py
+# Cheap rule-based detection of commitment lines ("I'll ...", "by Friday", ...).
+# Used to send only candidate lines (plus a little context) to DeepSeek, or on its
+# own as a rules-only action item extractor that needs no LLM at all.
+import re
+
+from modules.action_items_format import format_action_items, merge_action_items
+
+COMMITMENT_THRESHOLD = 2
+CONTEXT_LINES = 1
+
+WEEKDAYS = r"monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+MONTHS = r"january|february|march|april|may|june|july|august|september|october|november|december"
+TIME_EXPRESSION = (
+    rf"(?:(?:this|next|coming)\s+(?:{WEEKDAYS}|week|sprint|month|quarter)|{WEEKDAYS}|tomorrow(?:\s+\w+)?|tonight|today"
+    rf"|eod(?:\s+tomorrow)?|eow|end of (?:the )?(?:day|week|month|sprint|quarter)|(?:{MONTHS})\s+\d{{1,2}}"
+    rf"|\d{{1,2}}(?:st|nd|rd|th)?(?:\s+of)?\s+(?:{MONTHS})|q[1-4]|\d{{1,2}}(?::\d{{2}})?\s*(?:am|pm)|noon)"
+)
+
+# (pattern, weight)
+CUES = [
+    (re.compile(r"\b(i'll|i will|i'm going to|i am going to|i can|i'll take|let me|we'll|we will|we can)\b"), 2),
+    (re.compile(r"\b(let's|will be|action item|follow up|follow-up|to-do|todo)\b"), 2),
+    (re.compile(r"\b(don't forget|do not forget|remember to|make sure|please|can you|could you|can someone|assign)\b"), 2),
+    (re.compile(r"\b(need to|needs to|we'll need|should|must|have to|has to|plan to|going to|propose)\b"), 1),
+    (re.compile(r"\b(would you|waiting on|eta)\b"), 1),
+]
+DUE_PREPOSITION = r"(?:by|before|until|due|on|starting|from|for)"
+# (?!') keeps "today's meeting" from reading as a due date
+DUE_PATTERN = re.compile(rf"\b{DUE_PREPOSITION}\s+(?:the\s+)?({TIME_EXPRESSION})\b(?!')")
+TIME_PATTERN = re.compile(rf"\b({TIME_EXPRESSION})\b(?!')")
+
+SPEAKER_LINE = re.compile(r"^\s*(?:\[([^\]]+)\]|([^:\[\]]{1,40}?)\s*:)\s*(.*)$")
+LEADING_FILLER = re.compile(r"^(?:ok(?:ay)?|sure|great|noted|got it|agreed|yes|yeah|thanks|excellent|good idea|makes sense)[.,!]*\s+", re.IGNORECASE)
+LEADING_SUBJECT = re.compile(r"^(?:i'll|i will|i'm going to|i am going to|i can|we'll|we will|we can|let's|let me|i)\s+", re.IGNORECASE)
+
+_dateparser_search = None
+
+
+def _normalize(text):
+    return text.replace("’", "'").replace("‘", "'").lower()
+
+
+def _search_dates(text):
+    # dateparser catches date expressions the regex doesn't know about; it is optional
+    global _dateparser_search
+    if _dateparser_search is None:
+        try:
+            from dateparser.search import search_dates
+            _dateparser_search = search_dates
+        except ImportError:
+            _dateparser_search = False
+    if not _dateparser_search:
+        return None
+    try:
+        found = _dateparser_search(text, languages=["en"], settings={"PREFER_DATES_FROM": "future"})
+    except Exception:
+        return None
+    return found[0][0] if found else None
+
+
+def split_speaker(line):
+    match = SPEAKER_LINE.match(line)
+    if not match:
+        return None, line.strip()
+    return (match.group(1) or match.group(2)).strip(), match.group(3).strip()
+
+
+def find_due(text):
+    lowered = _normalize(text)
+    match = DUE_PATTERN.search(lowered) or TIME_PATTERN.search(lowered)
+    if match:
+        return text[match.start(1):match.end(1)]
+    return None
+
+
+def score_line(line):
+    _, text = split_speaker(line)
+    lowered = _normalize(text)
+    score = sum(weight for pattern, weight in CUES if pattern.search(lowered))
+    if DUE_PATTERN.search(lowered):
+        score += 2
+    elif TIME_PATTERN.search(lowered):
+        score += 1
+    elif score and _search_dates(text):
+        score += 1
+    return score
+
+
+def select_candidate_lines(transcript_lines, threshold=COMMITMENT_THRESHOLD, context=CONTEXT_LINES):
+    # Lines scoring at least `threshold`, each with `context` neighbours on both sides, in order
+    keep = set()
+    for i, line in enumerate(transcript_lines):
+        if line.strip() and score_line(line) >= threshold:
+            keep.update(range(max(0, i - context), min(len(transcript_lines), i + context + 1)))
+    return [transcript_lines[i] for i in sorted(keep) if transcript_lines[i].strip()]
+
+
+def _task_from_sentence(sentence, due):
+    task = LEADING_FILLER.sub("", sentence.replace("’", "'").strip())
+    task = LEADING_SUBJECT.sub("", task)
+    if due:
+        # "send a draft by Friday" -> "send a draft"; a bare "next week" stays part of the task
+        task = re.sub(rf"\s*\b{DUE_PREPOSITION}\s+(?:the\s+)?{re.escape(due)}\b", "", task, flags=re.IGNORECASE)
+    task = task.strip(" .,!?;:")
+    return task[:1].upper() + task[1:]
+
+
+def extract_action_items_rules(transcript_lines, threshold=COMMITMENT_THRESHOLD):
+    # Rules-only extraction: every commitment sentence becomes a task of its speaker
+    grouped = {}
+    for line in transcript_lines:
+        speaker, text = split_speaker(line)
+        if not text:
+            continue
+        speaker = speaker or "Unknown"
+        items = []
+        for sentence in re.split(r"(?<=[.!?])\s+", text):
+            if score_line(sentence) < threshold:
+                continue
+            due = find_due(sentence)
+            task = _task_from_sentence(sentence, due)
+            if task:
+                items.append({"task": task, "due": due or ""})
+        merge_action_items(grouped, {speaker: items})
+    return format_action_items(grouped) or "No action items found."
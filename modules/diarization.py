@@ -0,0 +1,90 @@
+# modules/diarization.py
+# pyannote speaker diarization of in-memory audio chunks, either in the calling process
+# or in a dedicated worker process (DiarizationProcess) that has its own interpreter,
+# GIL and torch thread pool, so it runs truly in parallel with Whisper.
+import multiprocessing
+import os
+import threading
+
+import torch
+from pyannote.audio import Pipeline
+from dotenv import load_dotenv
+
+load_dotenv()
+hf_token = os.getenv("HF_TOKEN")
+
+
+def load_diarization_pipeline():
+    return Pipeline.from_pretrained("pyannote/speaker-diarization",
+                                   use_auth_token=hf_token)
+
+
+def diarize_chunk(pipeline, audio, samplerate, return_embeddings=False):
+    # in-memory (channel, time) waveform, no file round-trip
+    waveform = {"waveform": torch.from_numpy(audio).unsqueeze(0), "sample_rate": samplerate}
+    if return_embeddings:
+        # also the centroid embedding of every local speaker, {label: vector}
+        diarization, centroids = pipeline(waveform, return_embeddings=True)
+        labels = diarization.labels()
+        embeddings = dict(zip(labels, centroids)) if centroids is not None else {}
+    else:
+        diarization = pipeline(waveform)
+    speaker_turns = []
+    for turn, _, speaker in diarization.itertracks(yield_label=True):
+        speaker_turns.append({
+            "speaker": speaker,
+            "start": turn.start,
+            "end": turn.end
+        })
+    if return_embeddings:
+        return speaker_turns, embeddings
+    return speaker_turns
+
+
+def _serve(conn, num_threads):
+    # Worker process: load the pipeline once, then diarize every chunk sent over the pipe
+    torch.set_num_threads(num_threads)
+    try:
+        pipeline = load_diarization_pipeline()
+    except Exception as e:
+        conn.send(("error", repr(e)))
+        return
+    conn.send(("ready", None))
+    while True:
+        request = conn.recv()
+        if request is None:
+            return
+        audio, samplerate, return_embeddings = request
+        try:
+            conn.send(("ok", diarize_chunk(pipeline, audio, samplerate, return_embeddings)))
+        except Exception as e:
+            conn.send(("error", repr(e)))
+
+
+class DiarizationProcess:
+    def __init__(self, num_threads):
+        context = multiprocessing.get_context("spawn")  # fork is unsafe once torch threads exist
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_serve, args=(child_conn, num_threads), name="diarization-worker", daemon=True
+        )
+        self._process.start()
+        self._lock = threading.Lock()
+        status, error = self._conn.recv()  # waits until the pipeline is loaded
+        if status == "error":
+            raise RuntimeError(f"Diarization worker could not load the pipeline: {error}")
+
+    def __call__(self, audio, samplerate, return_embeddings=False):
+        with self._lock:
+            self._conn.send((audio, samplerate, return_embeddings))
+            status, result = self._conn.recv()
+        if status == "error":
+            raise RuntimeError(f"Diarization worker failed: {result}")
+        return result
+
+    def close(self):
+        try:
+            self._conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(timeout=5)
@@ -3,24 +3,81 @@ from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
 import torch
 import os
 
+from modules.model_provider import register_model
+from modules.result_cache import cached_result, cached_stream
+from modules.streaming import stream_generate
+from modules.generation_profiles import measure_throughput, resolve_generation_args
+from modules.text_windows import count_tokens, split_into_windows
+from modules.speculative import speculative_generate
+from modules.prefix_cache import PrefixCache
+from modules.action_items_format import parse_action_items, merge_action_items, format_action_items
+from modules.commitment_filter import select_candidate_lines, extract_action_items_rules
+from modules.action_items_config import ACTION_ITEMS_ENABLED, ACTION_ITEMS_MODE, action_items_available
+
 MODEL_ID = "deepseek-ai/deepseek-llm-7b-chat"
 
-print("🔁 Loading DeepSeek model...")
-tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+# Transcripts longer than the window are split along speaker turns and the windows
+# are run as one batch; the per-window action items are merged per speaker
+ACTION_ITEMS_WINDOW_TOKENS = int(os.getenv("ACTION_ITEMS_WINDOW_TOKENS", "1536"))
+ACTION_ITEMS_WINDOW_OVERLAP = int(os.getenv("ACTION_ITEMS_WINDOW_OVERLAP", "64"))
+ACTION_ITEMS_BATCH_SIZE = int(os.getenv("ACTION_ITEMS_BATCH_SIZE", "2"))
+
+# Optional speculative decoding: a small causal LM sharing DeepSeek's tokenizer drafts
+# tokens that the 7B model verifies. Greedy output is unchanged.
+DRAFT_MODEL_ID = os.getenv("DRAFT_MODEL_ID", "")
+SPECULATIVE_DRAFT_TOKENS = int(os.getenv("SPECULATIVE_DRAFT_TOKENS", "4"))
+last_speculative_stats = {}
+
+# Keep the KV cache of the fixed instruction header and only prefill the transcript
+ACTION_ITEMS_PREFIX_CACHE = os.getenv("ACTION_ITEMS_PREFIX_CACHE", "true").lower() == "true"
+
+def load_deepseek():
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+    # batched prompts are padded on the left so generation continues right after each prompt
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    model = AutoModelForCausalLM.from_pretrained(
+        MODEL_ID,
+        device_map="auto",
+        torch_dtype=torch.float16,
+        offload_folder="offload"
+    )
+
+    generator = pipeline("text-generation", model=model, tokenizer=tokenizer)
+    return tokenizer, model, generator
 
-model = AutoModelForCausalLM.from_pretrained(
-    MODEL_ID,
-    device_map="auto",
-    torch_dtype=torch.float16,
-    offload_folder="offload" 
+def _after_deepseek_load(loaded):
+    tokenizer, model, _ = loaded
+    measure_throughput("action_items", tokenizer, model)
+    if ACTION_ITEMS_PREFIX_CACHE:
+        instruction_cache.get(tokenizer, model)
+
+deepseek_model = register_model(
+    "DeepSeek action items",
+    load_deepseek,
+    enabled=ACTION_ITEMS_ENABLED and ACTION_ITEMS_MODE != "rules",
+    on_load=_after_deepseek_load,
 )
 
-generator = pipeline("text-generation", model=model, tokenizer=tokenizer)
+def load_draft_model():
+    draft = AutoModelForCausalLM.from_pretrained(
+        DRAFT_MODEL_ID,
+        device_map="auto",
+        torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
+    )
+    draft.eval()
+    return draft
 
-def extract_action_items_with_deepseek(transcript_lines):
-    transcript_text = "\n".join(transcript_lines)
+draft_model = register_model(
+    "DeepSeek draft model",
+    load_draft_model,
+    enabled=deepseek_model.enabled and bool(DRAFT_MODEL_ID),
+)
 
-    prompt = f"""
+# Everything before the transcript is identical for every request
+PROMPT_PREFIX = """
 You are a smart AI meeting assistant. Read the following transcript and extract action items.
 Group the action items by speaker. For each speaker, list the tasks they committed to, along with due dates if available.
 
@@ -33,18 +90,153 @@ Speaker: [Name]
 
 Transcript:
 \"\"\"
-{transcript_text}
+"""
+
+instruction_cache = PrefixCache(PROMPT_PREFIX)
+
+def build_prompt_suffix(transcript_text):
+    return f"""{transcript_text}
 \"\"\"
 
 Grouped Action Items:
 """
 
-    result = generator(prompt, max_new_tokens=512, do_sample=False)
-    output = result[0]['generated_text']
+def build_prompt(transcript_text):
+    return PROMPT_PREFIX + build_prompt_suffix(transcript_text)
 
+def generate_with_prefix_cache(transcript_text, generate_args):
+    tokenizer, model, _ = deepseek_model.get()
+    new_ids = instruction_cache.generate(tokenizer, model, build_prompt_suffix(transcript_text), **generate_args)
+    return tokenizer.decode(new_ids, skip_special_tokens=True)
+
+def generate_speculative(transcript_text, generate_args, streamer=None):
+    tokenizer, model, _ = deepseek_model.get()
+    if ACTION_ITEMS_PREFIX_CACHE:
+        input_ids, past = instruction_cache.build_inputs(tokenizer, model, build_prompt_suffix(transcript_text))
+    else:
+        input_ids = tokenizer(build_prompt(transcript_text), return_tensors="pt")["input_ids"].to(model.device)
+        past = None
+    output_ids, stats = speculative_generate(
+        model,
+        draft_model.get(),
+        input_ids,
+        max_new_tokens=generate_args["max_new_tokens"],
+        num_draft_tokens=SPECULATIVE_DRAFT_TOKENS,
+        eos_token_id=tokenizer.eos_token_id,
+        past_key_values=past,
+        streamer=streamer,
+    )
+    last_speculative_stats.clear()
+    last_speculative_stats.update(stats)
+    print(
+        f"🔮 Speculative decoding: {stats['acceptance_rate']:.0%} of draft tokens accepted, "
+        f"{stats['tokens_per_sec']:.1f} tokens/sec"
+    )
+    return tokenizer.decode(output_ids[0, input_ids.shape[1]:], skip_special_tokens=True)
+
+def _strip_prompt(output):
     # Extract content after "Grouped Action Items:"
     if "Grouped Action Items:" in output:
         output = output.split("Grouped Action Items:")[-1].strip()
-
     return output
 
+def _as_lines(transcript_lines):
+    # online_app passes the chat history as one string
+    if isinstance(transcript_lines, str):
+        return transcript_lines.splitlines()
+    return transcript_lines
+
+def _cache_params(generate_args):
+    return dict(
+        generate_args,
+        window_tokens=ACTION_ITEMS_WINDOW_TOKENS,
+        overlap_tokens=ACTION_ITEMS_WINDOW_OVERLAP,
+        mode=ACTION_ITEMS_MODE,
+    )
+
+def _prefilter(transcript_lines):
+    # Lines worth sending to DeepSeek, or None if there are none
+    if ACTION_ITEMS_MODE != "prefilter":
+        return transcript_lines
+    candidates = select_candidate_lines(transcript_lines)
+    if not candidates:
+        return None
+    print(f"🔎 Commitment pre-filter kept {len(candidates)} of {len(transcript_lines)} lines")
+    return candidates
+
+# profile: "quality" / "balanced" / "fast"; or let latency_budget (seconds) pick one
+def extract_action_items_with_deepseek(transcript_lines, profile=None, latency_budget=None):
+    transcript_lines = _as_lines(transcript_lines)
+    profile, generate_args = resolve_generation_args("action_items", profile, latency_budget)
+    if ACTION_ITEMS_MODE == "rules":
+        return extract_action_items_rules(transcript_lines)
+    return cached_result(
+        "action_items", "\n".join(transcript_lines), MODEL_ID, _cache_params(generate_args),
+        lambda: _extract_action_items(transcript_lines, generate_args),
+    )
+
+# Same as extract_action_items_with_deepseek, but yields the output in pieces as the
+# tokens decode. Transcripts longer than one window come out in one piece once the
+# batched windows are merged.
+def stream_action_items(transcript_lines, profile=None, latency_budget=None):
+    transcript_lines = _as_lines(transcript_lines)
+    profile, generate_args = resolve_generation_args("action_items", profile, latency_budget)
+    if ACTION_ITEMS_MODE == "rules":
+        return iter([extract_action_items_rules(transcript_lines)])
+    return cached_stream(
+        "action_items", "\n".join(transcript_lines), MODEL_ID, _cache_params(generate_args),
+        lambda: _stream_action_items(transcript_lines, generate_args),
+    )
+
+def _stream_action_items(transcript_lines, generate_args):
+    candidates = _prefilter(transcript_lines)
+    if candidates is None:
+        yield extract_action_items_rules(transcript_lines)
+        return
+    tokenizer, model, _ = deepseek_model.get()
+    transcript_text = "\n".join(candidates)
+    if count_tokens(tokenizer, transcript_text) > ACTION_ITEMS_WINDOW_TOKENS:
+        yield extract_action_items_windowed(candidates, generate_args)
+        return
+    if draft_model.enabled and not generate_args.get("do_sample"):
+        generate = lambda streamer: generate_speculative(transcript_text, generate_args, streamer=streamer)
+    elif ACTION_ITEMS_PREFIX_CACHE:
+        generate = lambda streamer: instruction_cache.generate(
+            tokenizer, model, build_prompt_suffix(transcript_text), streamer=streamer, **generate_args
+        )
+    else:
+        inputs = tokenizer(build_prompt(transcript_text), return_tensors="pt").to(model.device)
+        generate = lambda streamer: model.generate(
+            **inputs, pad_token_id=tokenizer.pad_token_id, streamer=streamer, **generate_args
+        )
+    yield from stream_generate(tokenizer, generate)
+
+def _extract_action_items(transcript_lines, generate_args):
+    candidates = _prefilter(transcript_lines)
+    if candidates is None:
+        return extract_action_items_rules(transcript_lines)
+    transcript_lines = candidates
+    tokenizer, _, generator = deepseek_model.get()
+    transcript_text = "\n".join(transcript_lines)
+    if count_tokens(tokenizer, transcript_text) <= ACTION_ITEMS_WINDOW_TOKENS:
+        if draft_model.enabled and not generate_args.get("do_sample"):
+            return generate_speculative(transcript_text, generate_args).strip()
+        if ACTION_ITEMS_PREFIX_CACHE:
+            return generate_with_prefix_cache(transcript_text, generate_args).strip()
+        result = generator(build_prompt(transcript_text), **generate_args)
+        return _strip_prompt(result[0]['generated_text'])
+    return extract_action_items_windowed(transcript_lines, generate_args)
+
+def extract_action_items_windowed(transcript_lines, generate_args,
+                                  window_tokens=ACTION_ITEMS_WINDOW_TOKENS,
+                                  overlap_tokens=ACTION_ITEMS_WINDOW_OVERLAP):
+    tokenizer, _, generator = deepseek_model.get()
+    turns = [line.strip() for line in transcript_lines if line.strip()]
+    windows = split_into_windows(tokenizer, turns, window_tokens, overlap_tokens)
+    prompts = [build_prompt(window) for window in windows]
+    results = generator(prompts, batch_size=ACTION_ITEMS_BATCH_SIZE, **generate_args)
+
+    grouped = {}
+    for result in results:
+        merge_action_items(grouped, parse_action_items(_strip_prompt(result[0]['generated_text'])))
+    return format_action_items(grouped)
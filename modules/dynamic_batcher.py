@@ -0,0 +1,68 @@
+# modules/dynamic_batcher.py
+# Coalesces requests arriving from many threads (or clients) into batches: the first
+# request opens a window of at most `max_wait` seconds, everything that arrives in it
+# (up to `max_batch` requests) runs in one call. Requests with different keys (e.g.
+# language pairs) never share a batch.
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class DynamicBatcher:
+    def __init__(self, name, run_batch, max_batch=8, max_wait=0.02):
+        # run_batch(key, payloads) -> one result per payload, in the same order
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name=f"batcher-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, payload):
+        future = Future()
+        self._queue.put((key, payload, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            groups = {}
+            for key, payload, future in self._collect():
+                groups.setdefault(key, []).append((payload, future))
+            for key, items in groups.items():
+                self._run(key, items)
+
+    def _run(self, key, items):
+        self.batches += 1
+        self.requests += len(items)
+        try:
+            results = self.run_batch(key, [payload for payload, _ in items])
+        except Exception as e:
+            for _, future in items:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(items, results):
+            future.set_result(result)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+        }
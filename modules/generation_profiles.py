@@ -0,0 +1,86 @@
+# modules/generation_profiles.py
+import os
+import threading
+import time
+
+import torch
+
+# Named generation settings per task, from slowest / best to fastest
+SUMMARY_PROFILES = {
+    "quality": dict(max_length=256, min_length=50, length_penalty=2.0, num_beams=4, early_stopping=True),
+    "balanced": dict(max_length=192, min_length=40, length_penalty=2.0, num_beams=2, early_stopping=True),
+    "fast": dict(max_length=128, min_length=20, num_beams=1),
+}
+ACTION_ITEM_PROFILES = {
+    "quality": dict(max_new_tokens=512, do_sample=False),
+    "balanced": dict(max_new_tokens=320, do_sample=False),
+    "fast": dict(max_new_tokens=192, do_sample=False),
+}
+PROFILES = {"summary": SUMMARY_PROFILES, "action_items": ACTION_ITEM_PROFILES}
+PROFILE_ORDER = ["quality", "balanced", "fast"]
+DEFAULT_PROFILE = os.getenv("GENERATION_PROFILE", "quality")
+# Latency budgets (seconds) the apps ask for; 0 = always use DEFAULT_PROFILE
+SUMMARY_LATENCY_BUDGET = float(os.getenv("SUMMARY_LATENCY_BUDGET", "0"))
+ACTION_ITEMS_LATENCY_BUDGET = float(os.getenv("ACTION_ITEMS_LATENCY_BUDGET", "0"))
+
+THROUGHPUT_SAMPLE_TOKENS = 16
+THROUGHPUT_SAMPLE_TEXT = "Speaker 1: Let's review the project status and agree on next steps for the release."
+
+_throughput = {}  # kind -> decoded tokens/sec measured on this host
+_throughput_lock = threading.Lock()
+
+
+def measure_throughput(kind, tokenizer, model, new_tokens=THROUGHPUT_SAMPLE_TOKENS):
+    # Time a short greedy decode of a fixed length and remember tokens/sec for `kind`
+    inputs = tokenizer([THROUGHPUT_SAMPLE_TEXT], return_tensors="pt").to(model.device)
+    with torch.no_grad():
+        model.generate(**inputs, max_new_tokens=2, do_sample=False)  # warm-up
+        start = time.perf_counter()
+        model.generate(
+            **inputs,
+            max_new_tokens=new_tokens,
+            min_new_tokens=new_tokens,
+            do_sample=False,
+            num_beams=1,
+        )
+        elapsed = time.perf_counter() - start
+    tokens_per_sec = new_tokens / elapsed
+    with _throughput_lock:
+        _throughput[kind] = tokens_per_sec
+    print(f"⏱️ {kind}: {tokens_per_sec:.1f} tokens/sec on this host")
+    return tokens_per_sec
+
+
+def get_throughput(kind):
+    with _throughput_lock:
+        return _throughput.get(kind)
+
+
+def estimate_latency(kind, profile):
+    # Worst case: every output token decoded, once per beam
+    tokens_per_sec = get_throughput(kind)
+    if not tokens_per_sec:
+        return None
+    args = PROFILES[kind][profile]
+    max_tokens = args.get("max_new_tokens", args.get("max_length"))
+    return max_tokens * args.get("num_beams", 1) / tokens_per_sec
+
+
+def select_profile(kind, latency_budget=None):
+    # Best profile whose estimated latency fits the budget (seconds), "fast" if none does
+    if not latency_budget:
+        return DEFAULT_PROFILE
+    for profile in PROFILE_ORDER:
+        estimate = estimate_latency(kind, profile)
+        if estimate is None:
+            return DEFAULT_PROFILE  # not measured yet
+        if estimate <= latency_budget:
+            return profile
+    return PROFILE_ORDER[-1]
+
+
+def resolve_generation_args(kind, profile=None, latency_budget=None):
+    profile = profile or select_profile(kind, latency_budget)
+    if profile not in PROFILES[kind]:
+        raise ValueError(f"Unknown {kind} profile '{profile}', use one of {list(PROFILES[kind])}")
+    return profile, dict(PROFILES[kind][profile])
@@ -0,0 +1,106 @@
+# modules/inference_client.py
+# Thin client of inference_server.py with the same functions as the model modules.
+# With INFERENCE_SOCKET set, calls go over the Unix socket to the daemon, which owns
+# the models and batches requests of all processes together; without it they run
+# in this process as before. Only the local fallback imports torch / transformers.
+import json
+import os
+import socket
+import threading
+
+INFERENCE_SOCKET = os.getenv("INFERENCE_SOCKET", "")
+DEFAULT_SOCKET = "inference.sock"  # path the server listens on when INFERENCE_SOCKET is unset
+INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", "900"))
+
+
+class InferenceServerError(RuntimeError):
+    pass
+
+
+class InferenceClient:
+    # One connection per thread; requests on a connection are answered in order
+    def __init__(self, path, timeout=INFERENCE_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            conn = self._local.conn = sock.makefile("rwb")
+        return conn
+
+    def _close(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn.close()
+
+    def call(self, op, **args):
+        request = (json.dumps({"op": op, "args": args}, ensure_ascii=False) + "\n").encode("utf-8")
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                conn.write(request)
+                conn.flush()
+                line = conn.readline()
+                if not line:
+                    raise ConnectionError("inference server closed the connection")
+                break
+            except socket.timeout:
+                self._close()
+                raise
+            except (ConnectionError, OSError):
+                # the server may have restarted since this thread connected: reconnect once
+                self._close()
+                if attempt:
+                    raise
+        response = json.loads(line)
+        if "error" in response:
+            raise InferenceServerError(response["error"])
+        return response["result"]
+
+
+_client = InferenceClient(INFERENCE_SOCKET) if INFERENCE_SOCKET else None
+
+
+def translate_text(text, src_lang="en", tgt_lang="fr"):
+    if _client is None:
+        from modules.translator import translate_text as local_translate_text
+        return local_translate_text(text, src_lang=src_lang, tgt_lang=tgt_lang)
+    if not text.strip():
+        return text
+    return _client.call("translate", texts=[text], src_lang=src_lang, tgt_lang=tgt_lang)[0]
+
+
+def translate_batch(texts, src_lang="en", tgt_lang="fr"):
+    if _client is None:
+        from modules.translator import translate_batch as local_translate_batch
+        return local_translate_batch(texts, src_lang, tgt_lang)
+    return _client.call("translate", texts=list(texts), src_lang=src_lang, tgt_lang=tgt_lang)
+
+
+def generate_summary(text, profile=None, latency_budget=None):
+    if _client is None:
+        from modules.summarizer import generate_summary as local_generate_summary
+        return local_generate_summary(text, profile=profile, latency_budget=latency_budget)
+    return _client.call("summarize", text=text, profile=profile, latency_budget=latency_budget)
+
+
+def extract_action_items_with_deepseek(transcript_lines, profile=None, latency_budget=None):
+    if _client is None:
+        from modules.ds_action_items import extract_action_items_with_deepseek as local_extract
+        return local_extract(transcript_lines, profile=profile, latency_budget=latency_budget)
+    if isinstance(transcript_lines, str):
+        transcript_lines = transcript_lines.splitlines()
+    return _client.call(
+        "action_items", transcript_lines=list(transcript_lines), profile=profile, latency_budget=latency_budget
+    )
+
+
+def get_server_stats():
+    # Batching statistics of the daemon, None when running locally
+    return _client.call("stats") if _client is not None else None
@@ -0,0 +1,166 @@
+# modules/job_queue.py
+# SQLite-backed queue of LLM jobs (meeting summaries / action items) for online_app.
+# The app only enqueues jobs and polls their status; job_worker.py runs them in a
+# separate process, so generation survives browser refreshes and two owners ending
+# meetings at the same time don't fight over one in-process model.
+import os
+import sqlite3
+import time
+
+from modules import sqlite_db
+
+DB_PATH = os.getenv("JOB_QUEUE_DB", "jobs.db")
+# running jobs without a heartbeat for this long are handed out again
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "1800"))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))  # seconds, well below JOB_STALE_SECONDS
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "2"))
+
+JOB_KINDS = ("summary", "action_items")
+ACTIVE_STATUSES = ("pending", "running")
+
+
+def _create_schema(conn):
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                chatroom_name TEXT NOT NULL,
+                language TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL)"""
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_chatroom ON jobs (chatroom_name, kind)")
+
+
+def _connect():
+    # autocommit: every write below manages its own transaction
+    conn = sqlite_db.connect(DB_PATH, _create_schema, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def enqueue(kind, chatroom_name, language):
+    # Returns the job id; an identical job that hasn't started yet is reused
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind '{kind}', use one of {list(JOB_KINDS)}")
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE kind = ? AND chatroom_name = ? AND language = ? AND status = 'pending'",
+            (kind, chatroom_name, language),
+        ).fetchone()
+        if row:
+            job_id = row["id"]
+        else:
+            now = time.time()
+            job_id = conn.execute(
+                "INSERT INTO jobs (kind, chatroom_name, language, created, updated) VALUES (?, ?, ?, ?, ?)",
+                (kind, chatroom_name, language, now, now),
+            ).lastrowid
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return job_id
+
+
+def claim_next(worker):
+    # Oldest pending job, marked running by `worker`; None if the queue is empty
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        # jobs of a worker that died: retry, or give up after JOB_MAX_ATTEMPTS
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'worker stopped responding', updated = ? "
+            "WHERE status = 'running' AND updated < ? AND attempts >= ?",
+            (now, now - JOB_STALE_SECONDS, JOB_MAX_ATTEMPTS),
+        )
+        conn.execute(
+            "UPDATE jobs SET status = 'pending', worker = NULL, updated = ? WHERE status = 'running' AND updated < ?",
+            (now, now - JOB_STALE_SECONDS),
+        )
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE status = 'pending' ORDER BY created LIMIT 1"
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, updated = ? WHERE id = ?",
+                (worker, now, row["id"]),
+            )
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return dict(row) if row else None
+
+
+def _set(job_id, worker, **fields):
+    # Only while `worker` still owns the running job: once claim_next has handed it to
+    # another worker or given up on it, the old worker's updates are ignored.
+    # Returns False if the job is no longer this worker's.
+    fields["updated"] = time.time()
+    columns = ", ".join(f"{name} = ?" for name in fields)
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            f"UPDATE jobs SET {columns} WHERE id = ? AND status = 'running' AND worker = ?",
+            (*fields.values(), job_id, worker),
+        )
+    finally:
+        conn.close()
+    return cursor.rowcount > 0
+
+
+def heartbeat(job_id, worker):
+    # The worker is still on the job: keeps claim_next from handing it out again
+    return _set(job_id, worker)
+
+
+def complete(job_id, worker):
+    return _set(job_id, worker, status="done")
+
+
+def fail(job_id, worker, error):
+    return _set(job_id, worker, status="failed", error=str(error))
+
+
+def get_job(job_id):
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    return dict(row) if row else None
+
+
+def get_latest_job(chatroom_name, kind):
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE chatroom_name = ? AND kind = ? ORDER BY id DESC LIMIT 1",
+            (chatroom_name, kind),
+        ).fetchone()
+    finally:
+        conn.close()
+    return dict(row) if row else None
+
+
+def get_job_queue_stats():
+    conn = _connect()
+    try:
+        rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+    finally:
+        conn.close()
+    return {row["status"]: row["n"] for row in rows}
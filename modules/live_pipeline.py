@@ -0,0 +1,196 @@
+# modules/live_pipeline.py
+# Live transcription as concurrent stages joined by bounded queues:
+#
+#   capture ──> asr ──────────┐
+#          └──> diarization ──┴──> alignment ──> results()
+#
+# Every stage works on a different chunk at the same time, so once the pipeline is
+# full a chunk comes out every max(stage) seconds instead of every sum(stages).
+import os
+import queue
+import threading
+import time
+
+STAGE_QUEUE_SIZE = int(os.getenv("STAGE_QUEUE_SIZE", "2"))
+# What capture does when ASR or diarization is STAGE_QUEUE_SIZE chunks behind:
+# "block" waits for a free slot (the audio ring buffer then drops audio at the source),
+# "drop" skips the chunk so the transcript stays close to real time
+STAGE_DROP_POLICY = os.getenv("STAGE_DROP_POLICY", "block")
+POLL_SECONDS = 0.1  # how often waiting stages check for stop()
+
+
+class StageQueue:
+    # Bounded queue that remembers its deepest fill level
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        self.max_depth = 0
+        self._queue = queue.Queue(maxsize)
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def full(self):
+        return self._queue.full()
+
+    def put(self, item, stop_event):
+        while not stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=POLL_SECONDS)
+            except queue.Full:
+                continue
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+            return True
+        return False
+
+    def get(self, stop_event):
+        while not stop_event.is_set():
+            try:
+                return self._queue.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return None
+
+
+class StageStats:
+    def __init__(self):
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self.last_seconds = 0.0
+
+    def record(self, seconds):
+        self.processed += 1
+        self.busy_seconds += seconds
+        self.last_seconds = seconds
+
+    def as_dict(self):
+        return {
+            "processed": self.processed,
+            "mean_seconds": self.busy_seconds / self.processed if self.processed else 0.0,
+            "last_seconds": self.last_seconds,
+        }
+
+
+class LivePipeline:
+    # read_chunk() -> float32 audio (None on timeout); transcribe(audio) -> segments;
+    # diarize(audio) -> speaker turns; align(segments, turns) -> labeled lines;
+    # stage_setup: optional {stage name: fn} run first in that stage's thread
+    def __init__(self, read_chunk, transcribe, diarize, align,
+                 queue_size=STAGE_QUEUE_SIZE, drop_policy=STAGE_DROP_POLICY, stage_setup=None):
+        if drop_policy not in ("block", "drop"):
+            raise ValueError(f"Unknown drop policy '{drop_policy}', use block or drop")
+        self.read_chunk = read_chunk
+        self.transcribe = transcribe
+        self.diarize = diarize
+        self.align = align
+        self.drop_policy = drop_policy
+        self.stage_setup = stage_setup or {}
+        self.queues = {
+            name: StageQueue(name, queue_size)
+            for name in ("asr", "diarization", "asr_out", "diarization_out", "output")
+        }
+        self.stats = {name: StageStats() for name in ("capture", "asr", "diarization", "alignment")}
+        self.dropped_chunks = 0
+        self.last_latency = 0.0  # seconds from the end of a chunk's audio to its labeled lines
+        self._stop = threading.Event()
+        self._threads = []
+        self._error = None
+
+    def start(self):
+        for name, target in [
+            ("capture", self._capture),
+            ("asr", self._asr),
+            ("diarization", self._diarization),
+            ("alignment", self._alignment),
+        ]:
+            thread = threading.Thread(target=self._run, args=(target,), name=f"live-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def results(self):
+        # Labeled lines of every chunk, in order; re-raises errors of the stages
+        while True:
+            item = self.queues["output"].get(self._stop)
+            if item is None:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item
+
+    def metrics(self):
+        return {
+            "stages": {name: stats.as_dict() for name, stats in self.stats.items()},
+            "queues": {
+                name: {"depth": q.depth(), "max_depth": q.max_depth, "size": q.maxsize}
+                for name, q in self.queues.items()
+            },
+            "dropped_chunks": self.dropped_chunks,
+            "last_latency": self.last_latency,
+        }
+
+    def _run(self, target):
+        try:
+            target()
+        except Exception as e:
+            # stop the other stages; results() re-raises the error
+            self._error = e
+            self._stop.set()
+
+    def _capture(self):
+        index = 0
+        while not self._stop.is_set():
+            audio = self.read_chunk()
+            if audio is None:
+                continue
+            start = time.perf_counter()
+            # the ring buffer reuses its memory on the next read, later stages need their own copy
+            chunk = (index, time.monotonic(), audio.copy())
+            index += 1
+            if self.drop_policy == "drop" and (self.queues["asr"].full() or self.queues["diarization"].full()):
+                self.dropped_chunks += 1
+                continue
+            self.queues["asr"].put(chunk, self._stop)
+            self.queues["diarization"].put(chunk, self._stop)
+            self.stats["capture"].record(time.perf_counter() - start)
+
+    def _process(self, name, work):
+        if name in self.stage_setup:
+            self.stage_setup[name]()
+        while True:
+            chunk = self.queues[name].get(self._stop)
+            if chunk is None:
+                return
+            index, captured_at, audio = chunk
+            start = time.perf_counter()
+            result = work(audio)
+            self.stats[name].record(time.perf_counter() - start)
+            if not self.queues[f"{name}_out"].put((index, captured_at, result), self._stop):
+                return
+
+    def _asr(self):
+        self._process("asr", self.transcribe)
+
+    def _diarization(self):
+        self._process("diarization", self.diarize)
+
+    def _alignment(self):
+        while True:
+            asr = self.queues["asr_out"].get(self._stop)
+            diarization = self.queues["diarization_out"].get(self._stop)
+            if asr is None or diarization is None:
+                return
+            # both stages see the same chunks in the same order
+            index, captured_at, segments = asr
+            _, _, turns = diarization
+            start = time.perf_counter()
+            labeled = self.align(segments, turns)
+            self.stats["alignment"].record(time.perf_counter() - start)
+            self.last_latency = time.monotonic() - captured_at
+            if not self.queues["output"].put(labeled, self._stop):
+                return
@@ -0,0 +1,99 @@
+# modules/model_provider.py
+import os
+import threading
+import time
+
+# Models are registered at import time but only loaded on first use, or by the
+# background warm-up thread, so the apps can draw their UI right away.
+WARM_UP_MODELS = os.getenv("WARM_UP_MODELS", "true").lower() == "true"
+
+_registry = {}
+_warm_up_thread = None
+_warm_up_lock = threading.Lock()
+
+
+class LazyModel:
+    def __init__(self, name, loader, enabled=True, on_load=None):
+        self.name = name
+        self.loader = loader
+        self.on_load = on_load  # called once with the loaded value, e.g. to benchmark it
+        self.enabled = enabled
+        self.status = "not loaded" if enabled else "disabled"
+        self.error = None
+        self.load_time = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._value is not None:
+            return self._value
+        if not self.enabled:
+            raise RuntimeError(f"{self.name} is disabled on this node")
+        with self._lock:
+            if self._value is None:
+                self.status = "loading"
+                print(f"🔁 Loading {self.name}...")
+                start = time.perf_counter()
+                try:
+                    value = self.loader()
+                except Exception as e:
+                    self.status = "failed"
+                    self.error = e
+                    raise
+                self.load_time = time.perf_counter() - start
+                self.error = None
+                if self.on_load is not None:
+                    try:
+                        self.on_load(value)
+                    except Exception as e:
+                        print(f"⚠️ Post-load step of {self.name} failed: {e}")
+                self._value = value
+                self.status = "ready"
+                print(f"✅ {self.name} ready in {self.load_time:.1f}s")
+        return self._value
+
+    def is_ready(self):
+        return self._value is not None
+
+    def unload(self):
+        # Drops the loaded value (freed once no caller holds it); get() loads it again
+        with self._lock:
+            if self._value is not None:
+                self._value = None
+                self.status = "not loaded"
+                print(f"🗑️ Unloaded {self.name}")
+
+
+def register_model(name, loader, enabled=True, on_load=None):
+    if name not in _registry:
+        _registry[name] = LazyModel(name, loader, enabled, on_load)
+    return _registry[name]
+
+
+def get_model_status():
+    return [
+        {"name": m.name, "status": m.status, "load_time": m.load_time, "error": m.error}
+        for m in _registry.values()
+    ]
+
+
+def _warm_up(models):
+    # One model at a time so warm-up doesn't fight a first request for CPU and disk
+    for lazy_model in models:
+        if not lazy_model.enabled:
+            continue
+        try:
+            lazy_model.get()
+        except Exception as e:
+            print(f"⚠️ Warm-up of {lazy_model.name} failed: {e}")
+
+
+def start_warm_up(names=None):
+    global _warm_up_thread
+    with _warm_up_lock:
+        if _warm_up_thread is not None and _warm_up_thread.is_alive():
+            return _warm_up_thread
+        models = [m for m in _registry.values() if names is None or m.name in names]
+        _warm_up_thread = threading.Thread(target=_warm_up, args=(models,), name="model-warm-up", daemon=True)
+        _warm_up_thread.start()
+    return _warm_up_thread
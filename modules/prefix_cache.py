@@ -0,0 +1,58 @@
+# modules/prefix_cache.py
+import threading
+import time
+
+import torch
+
+
+def _to_legacy(past_key_values):
+    if hasattr(past_key_values, "to_legacy_cache"):
+        return past_key_values.to_legacy_cache()
+    return past_key_values
+
+
+class PrefixCache:
+    # Prefills a fixed prompt prefix once and keeps its key/value cache, so each request
+    # only has to prefill its own tokens. The cached tensors are never modified: every
+    # request gets a fresh tuple and the model appends to new tensors.
+    def __init__(self, prefix_text):
+        self.prefix_text = prefix_text
+        self._entries = {}  # id(model) -> (prefix_ids, past_key_values)
+        self._lock = threading.Lock()
+        self.prefill_time = None
+
+    def get(self, tokenizer, model):
+        key = id(model)
+        with self._lock:
+            if key not in self._entries:
+                prefix_ids = tokenizer(self.prefix_text, return_tensors="pt")["input_ids"].to(model.device)
+                start = time.perf_counter()
+                with torch.no_grad():
+                    out = model(prefix_ids, use_cache=True)
+                self.prefill_time = time.perf_counter() - start
+                self._entries[key] = (prefix_ids, _to_legacy(out.past_key_values))
+            return self._entries[key]
+
+    def build_inputs(self, tokenizer, model, suffix_text):
+        # input_ids of the whole prompt plus a cache that already covers the prefix part
+        prefix_ids, past = self.get(tokenizer, model)
+        suffix_ids = tokenizer(suffix_text, add_special_tokens=False, return_tensors="pt")["input_ids"]
+        input_ids = torch.cat([prefix_ids, suffix_ids.to(model.device)], dim=1)
+        return input_ids, tuple(tuple(layer) for layer in past)
+
+    def generate(self, tokenizer, model, suffix_text, **generate_args):
+        # Returns only the newly generated token ids
+        input_ids, past = self.build_inputs(tokenizer, model, suffix_text)
+        with torch.no_grad():
+            output_ids = model.generate(
+                input_ids,
+                attention_mask=torch.ones_like(input_ids),
+                past_key_values=past,
+                pad_token_id=tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id,
+                **generate_args
+            )
+        return output_ids[0, input_ids.shape[1]:]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
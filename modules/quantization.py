@@ -0,0 +1,43 @@
+# modules/quantization.py
+import os
+
+import torch
+
+# "fp32" (default) or "int8": int8 applies dynamic quantization to every nn.Linear,
+# which is where nearly all of the CPU time of the seq2seq models goes
+INFERENCE_PRECISION = os.getenv("INFERENCE_PRECISION", "fp32").lower()
+SUPPORTED_PRECISIONS = ("fp32", "int8")
+
+
+def quantize_model(model, precision=None):
+    precision = (precision or INFERENCE_PRECISION).lower()
+    if precision not in SUPPORTED_PRECISIONS:
+        raise ValueError(f"Unsupported precision '{precision}', use one of {SUPPORTED_PRECISIONS}")
+    if precision == "fp32":
+        return model
+    # Dynamic quantization only runs on CPU
+    model = model.to("cpu").eval()
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _tensors(value):
+    if isinstance(value, torch.Tensor):
+        yield value
+    elif isinstance(value, (tuple, list)):
+        for v in value:
+            yield from _tensors(v)
+
+
+def model_size_mb(model):
+    # Quantized weights live in packed params rather than model.parameters(), so walk the
+    # state dict instead. It lists tied weights (shared embeddings, lm_head) under every
+    # name, so each tensor is counted once by its memory address.
+    seen = set()
+    total = 0
+    for value in model.state_dict().values():
+        for tensor in _tensors(value):
+            if tensor.data_ptr() in seen:
+                continue
+            seen.add(tensor.data_ptr())
+            total += tensor.numel() * tensor.element_size()
+    return total / (1024 * 1024)
@@ -0,0 +1,143 @@
+# modules/result_cache.py
+import hashlib
+import json
+import os
+import time
+
+from modules import sqlite_db
+
+# Disk-backed cache of summaries / action items, keyed by a hash of the normalised
+# transcript, the model id and the generation parameters
+DB_PATH = os.getenv("RESULT_CACHE_DB", "result_cache.db")
+MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1000"))
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE", "true").lower() == "true"
+
+_stats = {}  # kind -> {"hits": n, "misses": n}
+
+
+def _create_schema(conn):
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS result_cache (
+                cache_key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL)"""
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_result_cache_last_used ON result_cache (last_used)"
+    )
+
+
+def _connect():
+    return sqlite_db.connect(DB_PATH, _create_schema)
+
+
+def normalize_transcript(text):
+    # Whitespace-only differences (Streamlit text areas, trailing newlines) share an entry
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def make_key(kind, text, model_id, params):
+    payload = json.dumps(
+        {"kind": kind, "model": model_id, "params": params, "text": normalize_transcript(text)},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get(cache_key):
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT result FROM result_cache WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE result_cache SET last_used = ? WHERE cache_key = ?",
+                (time.time(), cache_key),
+            )
+            conn.commit()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def put(cache_key, kind, result):
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO result_cache (cache_key, kind, result, created, last_used) VALUES (?, ?, ?, ?, ?)",
+            (cache_key, kind, result, now, now),
+        )
+        # Keep the most recently used MAX_ENTRIES results
+        conn.execute(
+            "DELETE FROM result_cache WHERE cache_key NOT IN (SELECT cache_key FROM result_cache ORDER BY last_used DESC LIMIT ?)",
+            (MAX_ENTRIES,),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def cached_result(kind, text, model_id, params, compute):
+    if not RESULT_CACHE_ENABLED:
+        return compute()
+    counters = _stats.setdefault(kind, {"hits": 0, "misses": 0})
+    cache_key = make_key(kind, text, model_id, params)
+    result = get(cache_key)
+    if result is not None:
+        counters["hits"] += 1
+        return result
+    counters["misses"] += 1
+    result = compute()
+    put(cache_key, kind, result)
+    return result
+
+
+def cached_results(kind, texts, model_id, params, compute_many):
+    # Batch version of cached_result: compute_many(missing_texts) -> results in the same order
+    if not RESULT_CACHE_ENABLED:
+        return compute_many(list(texts))
+    counters = _stats.setdefault(kind, {"hits": 0, "misses": 0})
+    keys = [make_key(kind, text, model_id, params) for text in texts]
+    results = [get(cache_key) for cache_key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    counters["hits"] += len(texts) - len(missing)
+    counters["misses"] += len(missing)
+    if missing:
+        for i, result in zip(missing, compute_many([texts[i] for i in missing])):
+            put(keys[i], kind, result)
+            results[i] = result
+    return results
+
+
+def cached_stream(kind, text, model_id, params, compute_stream):
+    # Like cached_result for generators of text pieces: a hit is yielded in one piece,
+    # a miss is passed through as it streams and stored once it has finished
+    if not RESULT_CACHE_ENABLED:
+        yield from compute_stream()
+        return
+    counters = _stats.setdefault(kind, {"hits": 0, "misses": 0})
+    cache_key = make_key(kind, text, model_id, params)
+    result = get(cache_key)
+    if result is not None:
+        counters["hits"] += 1
+        yield result
+        return
+    counters["misses"] += 1
+    pieces = []
+    for piece in compute_stream():
+        pieces.append(piece)
+        yield piece
+    put(cache_key, kind, "".join(pieces).strip())
+
+def get_result_cache_stats():
+    stats = {}
+    for kind, counters in _stats.items():
+        lookups = counters["hits"] + counters["misses"]
+        stats[kind] = dict(counters, hit_rate=counters["hits"] / lookups if lookups else 0.0)
+    return stats
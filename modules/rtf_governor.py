@@ -0,0 +1,137 @@
+# modules/rtf_governor.py
+# Keeps live transcription real time on whatever machine it runs on. The ASR stage
+# reports how long each chunk took against how long the chunk was (real-time factor);
+# when the recent average goes over the target the governor steps down to a cheaper
+# Whisper tier (smaller model / greedy decoding), and back up when there is headroom.
+# A tier with a different model size is loaded in the background first, so a switch
+# never stalls the pipeline; only the models of the current tier and its neighbours
+# stay loaded.
+import os
+import threading
+from collections import deque, namedtuple
+
+import whisper
+
+from modules.model_provider import LazyModel
+
+# Most to least expensive; "size:beam size[:nofallback]". Beam search and the temperature
+# fallback (re-decoding a failed chunk at higher temperatures) cost extra decodes.
+WHISPER_TIERS = os.getenv("WHISPER_TIERS", "medium:5,small:5,small:1,base:1,base:1:nofallback,tiny:1:nofallback")
+WHISPER_START_TIER = os.getenv("WHISPER_START_TIER", "small:1")  # whisper's own defaults
+RTF_TARGET = float(os.getenv("RTF_TARGET", "0.8"))  # ASR seconds per second of audio
+RTF_WINDOW = int(os.getenv("RTF_WINDOW", "3"))  # chunks averaged before each decision
+
+UPGRADE_FRACTION = 0.4  # step up only below target * this (the next tier is often 2x slower)
+PREWARM_FRACTION = 0.8  # above target * this, load the cheaper tier's model just in case
+
+
+class WhisperTier(namedtuple("WhisperTier", "size beam_size fallback")):
+    @classmethod
+    def parse(cls, spec):
+        size, beam_size, *flags = spec.strip().split(":")
+        return cls(size, int(beam_size), "nofallback" not in flags)
+
+    @property
+    def name(self):
+        decoding = f"beam {self.beam_size}" if self.beam_size > 1 else "greedy"
+        return f"{self.size} ({decoding}{'' if self.fallback else ', no fallback'})"
+
+    def decode_options(self, device):
+        options = {"fp16": device == "cuda"}  # fp16 on CPU only warns and falls back to fp32
+        if self.beam_size > 1:
+            options["beam_size"] = self.beam_size
+        if not self.fallback:
+            options["temperature"] = 0.0
+        return options
+
+
+def parse_tiers(specs):
+    return [WhisperTier.parse(spec) for spec in specs.split(",") if spec.strip()]
+
+
+START_TIER = WhisperTier.parse(WHISPER_START_TIER)
+
+
+class RTFGovernor:
+    # models: optional {size: LazyModel} to reuse, e.g. the registered Whisper of START_TIER
+    def __init__(self, tiers=None, start=START_TIER, target=RTF_TARGET, window=RTF_WINDOW, models=None):
+        self.tiers = tiers or parse_tiers(WHISPER_TIERS)
+        if start not in self.tiers:
+            raise ValueError(f"Whisper start tier {start.name} is not one of WHISPER_TIERS")
+        self.index = self.tiers.index(start)
+        self.target = target
+        self.last_rtf = 0.0
+        self.switches = []  # (from tier name, to tier name, average RTF)
+        self._models = dict(models or {})
+        self._recent = deque(maxlen=window)
+        self._pending = None  # tier waiting for its model to load
+
+    @property
+    def tier(self):
+        return self.tiers[self.index]
+
+    def current(self):
+        # (Whisper model, transcribe() options) for the next chunk
+        model = self._model(self.tier.size).get()
+        return model, self.tier.decode_options(model.device.type)
+
+    def observe(self, seconds, audio_seconds):
+        self.last_rtf = seconds / audio_seconds
+        self._recent.append(self.last_rtf)
+        if self._pending is not None:
+            self._switch_when_loaded()
+            return
+        if len(self._recent) < self._recent.maxlen:
+            return
+        rtf = sum(self._recent) / len(self._recent)
+        if rtf > self.target and self.index < len(self.tiers) - 1:
+            self._step(self.index + 1)
+        elif rtf < self.target * UPGRADE_FRACTION and self.index > 0:
+            self._step(self.index - 1)
+        elif rtf > self.target * PREWARM_FRACTION and self.index < len(self.tiers) - 1:
+            self._prewarm(self.tiers[self.index + 1].size)
+
+    def _model(self, size):
+        if size not in self._models:
+            # not registered: the app's warm-up shouldn't load every tier
+            self._models[size] = LazyModel(f"Whisper {size}", lambda: whisper.load_model(size))
+        return self._models[size]
+
+    def _prewarm(self, size):
+        lazy_model = self._model(size)
+        if lazy_model.is_ready() or lazy_model.status == "loading":
+            return
+        def load():
+            try:
+                lazy_model.get()
+            except Exception as e:
+                print(f"⚠️ Pre-warming Whisper {size} failed: {e}")
+        threading.Thread(target=load, name=f"whisper-{size}-warm-up", daemon=True).start()
+
+    def _step(self, index):
+        self._pending = index
+        self._prewarm(self.tiers[index].size)
+        if self._model(self.tiers[index].size).is_ready():
+            self._switch_when_loaded()
+
+    def _switch_when_loaded(self):
+        lazy_model = self._model(self.tiers[self._pending].size)
+        if lazy_model.status == "failed":
+            self._pending = None  # stay on the current tier, retry on the next decision
+            self._recent.clear()
+            return
+        if not lazy_model.is_ready():
+            return
+        rtf = sum(self._recent) / len(self._recent)
+        previous, self.index, self._pending = self.tier, self._pending, None
+        self.switches.append((previous.name, self.tier.name, rtf))
+        print(f"🎚️ Whisper {previous.name} → {self.tier.name} (RTF {rtf:.2f}, target {self.target:.2f})")
+        self._recent.clear()  # judge the new tier on its own chunks
+        self._release_far_models()
+
+    def _release_far_models(self):
+        # a host that had to step down can't afford to keep every size in memory
+        near = {tier.size for tier in self.tiers[max(self.index - 1, 0):self.index + 2]}
+        for size, lazy_model in self._models.items():
+            if size not in near and lazy_model.status != "loading":
+                lazy_model.unload()
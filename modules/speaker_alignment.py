@@ -0,0 +1,80 @@
+# modules/speaker_alignment.py
+# Which speaker said each Whisper segment: the speaker whose diarization turns overlap
+# the segment for the longest total time. Segments and turns are sorted once and swept
+# together instead of scanning every turn for every segment; large inputs (a whole
+# recording) take a vectorized NumPy path that gives the same result without ever
+# pairing segments with turns, so a long turn can't make it quadratic.
+import numpy as np
+
+VECTORIZED_MIN_ITEMS = 1000  # segments + turns from which the NumPy path is faster
+OVERLAP_EPSILON = 1e-6  # seconds; overlaps closer than this count as equal
+
+
+def match_speakers(segments, turns):
+    # segments: [{"start", "end", ...}]; turns: [{"speaker", "start", "end"}].
+    # Returns the speaker of every segment, in the segments' order (None if no turn overlaps).
+    if not segments or not turns:
+        return [None] * len(segments)
+    if len(segments) + len(turns) >= VECTORIZED_MIN_ITEMS:
+        return _match_vectorized(segments, turns)
+    return _match_sweep(segments, turns)
+
+
+def _match_sweep(segments, turns):
+    turns = sorted(turns, key=lambda t: t["start"])
+    order = sorted(range(len(segments)), key=lambda i: segments[i]["start"])
+    speakers = [None] * len(segments)
+    active = []  # turns that started before the current segment ends and may still overlap it
+    next_turn = 0
+    for i in order:
+        start, end = segments[i]["start"], segments[i]["end"]
+        while next_turn < len(turns) and turns[next_turn]["start"] < end:
+            active.append(turns[next_turn])
+            next_turn += 1
+        # segments come by start time, so a turn that ended before this one starts is done for good
+        active = [t for t in active if t["end"] > start]
+        totals = {}
+        for turn in active:
+            overlap = min(end, turn["end"]) - max(start, turn["start"])
+            if overlap > 0:
+                totals[turn["speaker"]] = totals.get(turn["speaker"], 0.0) + overlap
+        most = max(totals.values(), default=0.0)
+        if most > OVERLAP_EPSILON:
+            # ties (within rounding) go to the first label in sorted order, as in the NumPy path
+            speakers[i] = next(label for label in sorted(totals) if totals[label] >= most - OVERLAP_EPSILON)
+    return speakers
+
+
+def _sum_min(t, sorted_values, prefix):
+    # sum(min(t, v) for v in sorted_values) for every t; prefix = [0, cumsum(sorted_values)]
+    below = np.searchsorted(sorted_values, t, side="right")
+    return prefix[below] + t * (len(sorted_values) - below)
+
+
+def _match_vectorized(segments, turns):
+    # A turn [s, e] overlaps [0, t] for min(t, e) - min(t, s) seconds, so the time a speaker
+    # has spoken up to t is C(t) = sum(min(t, e)) - sum(min(t, s)) over the speaker's turns,
+    # and their overlap with a segment [a, b] is C(b) - C(a): O((n + m) log m) per speaker.
+    seg_start = np.fromiter((s["start"] for s in segments), dtype=np.float64, count=len(segments))
+    seg_end = np.fromiter((s["end"] for s in segments), dtype=np.float64, count=len(segments))
+    turn_start = np.fromiter((t["start"] for t in turns), dtype=np.float64, count=len(turns))
+    turn_end = np.fromiter((t["end"] for t in turns), dtype=np.float64, count=len(turns))
+    labels, speaker = np.unique([t["speaker"] for t in turns], return_inverse=True)
+
+    totals = np.zeros((len(segments), len(labels)))
+    for i in range(len(labels)):
+        mine = speaker == i
+        starts, ends = np.sort(turn_start[mine]), np.sort(turn_end[mine])
+        start_prefix = np.concatenate(([0.0], np.cumsum(starts)))
+        end_prefix = np.concatenate(([0.0], np.cumsum(ends)))
+
+        def spoken(t):
+            return _sum_min(t, ends, end_prefix) - _sum_min(t, starts, start_prefix)
+
+        totals[:, i] = spoken(seg_end) - spoken(seg_start)
+    # the prefix sums round: totals within OVERLAP_EPSILON of the best are ties, won by
+    # the first label, and anything that small is no overlap at all
+    most = totals.max(axis=1)
+    best = (totals >= most[:, None] - OVERLAP_EPSILON).argmax(axis=1)
+    found = most > OVERLAP_EPSILON
+    return [labels[b].item() if f else None for b, f in zip(best, found)]
@@ -0,0 +1,69 @@
+# modules/speaker_index.py
+# Running index of the speakers of a live meeting. Each chunk is diarized on its own
+# (cheap, only the new audio); its local speakers are then matched against the
+# centroids of every speaker heard so far by cosine similarity, so "Speaker 2" stays
+# the same person for the whole meeting.
+import os
+
+import numpy as np
+
+SPEAKER_MATCH_THRESHOLD = float(os.getenv("SPEAKER_MATCH_THRESHOLD", "0.35"))  # min cosine similarity
+
+
+class SpeakerIndex:
+    def __init__(self, threshold=SPEAKER_MATCH_THRESHOLD, initial_capacity=16):
+        self.threshold = threshold
+        self.dim = None
+        self._sums = None  # duration-weighted sums of the normalised embeddings, one row per speaker
+        self._weights = np.zeros(initial_capacity, dtype=np.float64)
+        self.size = 0
+        self._initial_capacity = initial_capacity
+
+    def _grow(self, dim):
+        if self._sums is None:
+            self.dim = dim
+            self._sums = np.zeros((self._initial_capacity, dim), dtype=np.float64)
+        elif self.size == len(self._sums):
+            self._sums = np.concatenate([self._sums, np.zeros_like(self._sums)])
+            self._weights = np.concatenate([self._weights, np.zeros_like(self._weights)])
+
+    def centroids(self):
+        sums = self._sums[:self.size]
+        return sums / np.linalg.norm(sums, axis=1, keepdims=True)
+
+    def assign(self, embeddings, durations):
+        # embeddings: (n, dim) of one chunk's local speakers, durations: seconds each spoke.
+        # Returns a global speaker id per row (None for rows without a usable embedding).
+        # Local speakers of one chunk are different people, so each global id is used once.
+        embeddings = np.asarray(embeddings, dtype=np.float64)
+        ids = [None] * len(embeddings)
+        usable = np.flatnonzero(np.isfinite(embeddings).all(axis=1) & (np.abs(embeddings).sum(axis=1) > 0))
+        if not len(usable):
+            return ids
+        normed = embeddings[usable] / np.linalg.norm(embeddings[usable], axis=1, keepdims=True)
+        similarity = normed @ self.centroids().T if self.size else np.empty((len(usable), 0))
+
+        # longest local speakers pick first: their embeddings are the most reliable
+        for row in np.argsort(-np.asarray(durations, dtype=np.float64)[usable]):
+            best = int(np.argmax(similarity[row])) if similarity.shape[1] else -1
+            if best >= 0 and similarity[row, best] >= self.threshold:
+                speaker = best
+                similarity[:, best] = -np.inf  # taken for this chunk
+            else:
+                self._grow(normed.shape[1])
+                speaker = self.size
+                self.size += 1
+            weight = max(float(durations[usable[row]]), 1e-3)
+            self._sums[speaker] += weight * normed[row]
+            self._weights[speaker] += weight
+            ids[usable[row]] = speaker
+        return ids
+
+    def label_turns(self, turns, embeddings):
+        # turns: [{"speaker": local label, "start", "end"}]; embeddings: {local label: vector}.
+        # Returns the turns with stable "Speaker N" labels.
+        local = list(embeddings)
+        durations = [sum(t["end"] - t["start"] for t in turns if t["speaker"] == label) for label in local]
+        ids = self.assign([embeddings[label] for label in local], durations) if local else []
+        names = {label: f"Speaker {i + 1}" if i is not None else "Unknown" for label, i in zip(local, ids)}
+        return [dict(turn, speaker=names.get(turn["speaker"], "Unknown")) for turn in turns]
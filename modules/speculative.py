@@ -0,0 +1,102 @@
+# modules/speculative.py
+# Greedy speculative (assisted) generation, where a small draft model proposes a few tokens,
+# the large target model checks them all in one forward pass and keeps the longest
+# prefix it agrees with plus its own next token. The output is exactly what greedy
+# decoding with the target model alone would produce.
+import time
+
+import torch
+
+
+def _crop_past(past_key_values, length):
+    if past_key_values is None:
+        return None
+    if hasattr(past_key_values, "crop"):  # transformers Cache objects
+        past_key_values.crop(length)
+        return past_key_values
+    return tuple(
+        tuple(t[:, :, :length, :] for t in layer) for layer in past_key_values
+    )
+
+
+@torch.no_grad()
+def speculative_generate(target_model, draft_model, input_ids, max_new_tokens,
+                         num_draft_tokens=4, eos_token_id=None, past_key_values=None, streamer=None):
+    # input_ids: (1, prompt_len) on the target model's device
+    # past_key_values: optional target cache for a prefix of input_ids (see PrefixCache)
+    # streamer: optional transformers streamer, fed like model.generate feeds it
+    # Returns (ids including the prompt, stats)
+    prompt_len = input_ids.shape[1]
+    ids = input_ids
+    # target cache covers ids[:, :target_len]
+    target_past = past_key_values
+    target_len = past_key_values[0][0].shape[2] if past_key_values is not None else 0
+    draft_past, draft_len = None, 0
+    proposed = accepted = target_passes = 0
+    start = time.perf_counter()
+    if streamer is not None:
+        streamer.put(input_ids.cpu())
+    emitted = prompt_len
+
+    while ids.shape[1] - prompt_len < max_new_tokens:
+        remaining = max_new_tokens - (ids.shape[1] - prompt_len)
+
+        # 1. the draft model proposes up to k tokens greedily
+        draft_ids = ids.to(draft_model.device)
+        proposal = []
+        for _ in range(min(num_draft_tokens, remaining)):
+            out = draft_model(draft_ids[:, draft_len:], past_key_values=draft_past, use_cache=True)
+            draft_past, draft_len = out.past_key_values, draft_ids.shape[1]
+            next_token = out.logits[:, -1, :].argmax(dim=-1, keepdim=True)
+            proposal.append(next_token)
+            draft_ids = torch.cat([draft_ids, next_token], dim=1)
+            if eos_token_id is not None and next_token.item() == eos_token_id:
+                break
+        proposal = torch.cat(proposal, dim=1).to(ids.device)
+
+        # 2. the target model scores the whole proposal in a single pass
+        candidate = torch.cat([ids, proposal], dim=1)
+        out = target_model(candidate[:, target_len:], past_key_values=target_past, use_cache=True)
+        target_passes += 1
+        offset = ids.shape[1] - 1 - target_len
+        target_tokens = out.logits[:, offset:, :].argmax(dim=-1)  # one more than the proposal
+
+        n_accepted = 0
+        while n_accepted < proposal.shape[1] and proposal[0, n_accepted] == target_tokens[0, n_accepted]:
+            n_accepted += 1
+        new_tokens = torch.cat([proposal[:, :n_accepted], target_tokens[:, n_accepted:n_accepted + 1]], dim=1)
+        proposed += proposal.shape[1]
+        accepted += n_accepted
+
+        # 3. drop cache entries of rejected tokens; the target's own token isn't cached yet
+        target_len = ids.shape[1] + n_accepted
+        target_past = _crop_past(out.past_key_values, target_len)
+        draft_len = min(draft_len, target_len)
+        draft_past = _crop_past(draft_past, draft_len)
+        ids = torch.cat([ids, new_tokens], dim=1)
+
+        finished = eos_token_id is not None and bool((new_tokens == eos_token_id).any())
+        if finished:
+            eos_at = (ids[0, prompt_len:] == eos_token_id).nonzero()[0].item()
+            ids = ids[:, :prompt_len + eos_at + 1]
+        if streamer is not None:
+            streamer.put(ids[0, emitted:prompt_len + max_new_tokens].cpu())
+            emitted = ids.shape[1]
+        if finished:
+            break
+
+    ids = ids[:, :prompt_len + max_new_tokens]
+    if streamer is not None:
+        streamer.end()
+    elapsed = time.perf_counter() - start
+    new_token_count = ids.shape[1] - prompt_len
+    stats = {
+        "new_tokens": new_token_count,
+        "proposed": proposed,
+        "accepted": accepted,
+        "acceptance_rate": accepted / proposed if proposed else 0.0,
+        "target_passes": target_passes,
+        "tokens_per_sec": new_token_count / elapsed if elapsed else 0.0,
+        "seconds": elapsed,
+    }
+    return ids, stats
@@ -0,0 +1,24 @@
+# modules/sqlite_db.py
+# Connections to the app's small SQLite stores (translation memory, result cache, job
+# queue). Each call opens its own connection, so threads and processes never share
+# one; WAL mode and the schema are set up once per database file per process.
+import sqlite3
+import threading
+
+_init_lock = threading.Lock()
+_initialized = set()  # (db path, create_schema) already set up in this process
+
+
+def connect(db_path, create_schema, **kwargs):
+    # create_schema(conn) runs CREATE ... IF NOT EXISTS statements on first use;
+    # kwargs go to sqlite3.connect (e.g. isolation_level=None)
+    conn = sqlite3.connect(db_path, timeout=30, **kwargs)
+    key = (db_path, create_schema)
+    if key not in _initialized:
+        with _init_lock:
+            if key not in _initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                create_schema(conn)
+                conn.commit()
+                _initialized.add(key)
+    return conn
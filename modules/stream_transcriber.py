@@ -1,38 +1,66 @@
-import sounddevice as sd
 import soundfile as sf
-import queue
 import os
+import time
+import torch
 import whisper
 from datetime import datetime
-from pyannote.audio import Pipeline
-from dotenv import load_dotenv
 
-model = whisper.load_model("small")  # "medium" if system handles it
-
-load_dotenv()
-hf_token = os.getenv("HF_TOKEN")
-pipeline = Pipeline.from_pretrained("pyannote/speaker-diarization",
-                                    use_auth_token=hf_token)
-
-q = queue.Queue()
-
-def audio_callback(indata, frames, time, status):
-    q.put(indata.copy())
-
-def assign_speakers(segments, speaker_turns):
+from modules.model_provider import register_model
+from modules.audio_buffer import AudioRingBuffer
+from modules.live_pipeline import LivePipeline
+from modules.diarization import load_diarization_pipeline, diarize_chunk, DiarizationProcess
+from modules.speaker_alignment import match_speakers
+from modules.speaker_index import SpeakerIndex
+from modules.vad import PauseChunker, block_samples
+from modules.rtf_governor import RTFGovernor, START_TIER
+
+# Chunks are transcribed straight from memory; set to also keep them as WAV files
+SAVE_AUDIO_CHUNKS = os.getenv("SAVE_AUDIO_CHUNKS", "false").lower() == "true"
+AUDIO_BUFFER_CHUNKS = int(os.getenv("AUDIO_BUFFER_CHUNKS", "3"))  # ring buffer size in chunks
+
+# ASR and diarization of a chunk run at the same time; their torch intra-op thread pools
+# split the cores instead of both trying to use all of them
+CPU_COUNT = os.cpu_count() or 1
+
+
+def set_thread_torch_threads(num_threads):
+    # torch.set_num_threads also stores a process-wide count, which a thread's lazy
+    # per-thread init re-applies on its first parallel op. Force that init first, so the
+    # count set here stays this thread's and another stage's call can't override it.
+    torch.get_num_threads()
+    torch.set_num_threads(num_threads)
+
+DIARIZATION_THREADS = int(os.getenv("DIARIZATION_THREADS", str(max(1, CPU_COUNT // 3))))
+ASR_THREADS = int(os.getenv("ASR_THREADS", str(max(1, CPU_COUNT - DIARIZATION_THREADS))))
+# "thread": diarization in a thread of this process; "process": in its own worker process
+DIARIZATION_WORKER = os.getenv("DIARIZATION_WORKER", "thread")
+# "incremental": speakers keep their label for the whole meeting (SpeakerIndex);
+# "per_chunk": every chunk numbers its speakers from 1 again
+DIARIZATION_MODE = os.getenv("DIARIZATION_MODE", "incremental")
+# "vad": speech-only chunks cut at pauses (chunk_duration is the longest chunk);
+# "fixed": every chunk_duration seconds, silence included
+LIVE_CHUNKING = os.getenv("LIVE_CHUNKING", "vad")
+# step between WHISPER_TIERS to keep live ASR below RTF_TARGET (see modules/rtf_governor.py)
+WHISPER_GOVERNOR = os.getenv("WHISPER_GOVERNOR", "true").lower() == "true"
+
+# WHISPER_START_TIER's model; the governor moves to bigger or smaller ones as the host allows
+whisper_model = register_model(f"Whisper {START_TIER.size}", lambda: whisper.load_model(START_TIER.size))
+diarization_model = register_model("pyannote diarization", load_diarization_pipeline)
+
+# relabel=False keeps the turns' speaker labels (already global, see SpeakerIndex)
+def assign_speakers(segments, speaker_turns, relabel=True):
     labeled = []
     speaker_map = {}
     speaker_counter = 1
 
-    for seg in segments:
-        start, end = seg['start'], seg['end']
-        matched_speaker = "Unknown"
+    # speaker with the most overlap per segment
+    matched = match_speakers(segments, speaker_turns)
+    for seg, matched_speaker in zip(segments, matched):
+        matched_speaker = matched_speaker or "Unknown"
 
-        # Try to find speaker label by overlap
-        for turn in speaker_turns:
-            if turn["start"] <= end and turn["end"] >= start:
-                matched_speaker = turn["speaker"]
-                break
+        if not relabel:
+            labeled.append(f"[{matched_speaker}] {seg['text'].strip()}")
+            continue
 
         # Assign readable label (Speaker 1, Speaker 2)
         if matched_speaker not in speaker_map:
@@ -45,36 +73,102 @@ def assign_speakers(segments, speaker_turns):
     return labeled
 
 
-def stream_transcribe_live(chunk_duration=10, samplerate=16000):
+def save_chunk(audio, samplerate, chunk_index):
     os.makedirs("assets/temp_chunks", exist_ok=True)
+    sf.write(f"assets/temp_chunks/chunk_{chunk_index}.wav", audio, samplerate, subtype='PCM_16')
+
+def transcribe_chunk(model, audio, **decode_options):
+    result = model.transcribe(audio, language="en", task="transcribe", **decode_options)
+    return result.get("segments", [])
+
+# Queue depths / stage timings of the running live pipeline (see LivePipeline.metrics)
+live_pipeline_metrics = {}
+
+def stream_transcribe_live(chunk_duration=10, samplerate=16000):
+    import sounddevice as sd  # needs PortAudio; batch_transcribe.py runs without a microphone
+    # samplerate must stay 16 kHz: Whisper takes the raw samples without resampling
+    whisper_model.get()  # load before capture starts
+    if DIARIZATION_WORKER == "process":
+        diarize = DiarizationProcess(DIARIZATION_THREADS)
+    else:
+        pipeline = diarization_model.get()
+        diarize = lambda audio, samplerate, return_embeddings=False: diarize_chunk(
+            pipeline, audio, samplerate, return_embeddings
+        )
+    speaker_index = SpeakerIndex() if DIARIZATION_MODE == "incremental" else None
+    governor = RTFGovernor(models={START_TIER.size: whisper_model}) if WHISPER_GOVERNOR else None
+
+    def transcribe_stage(audio):
+        if governor is None:
+            return transcribe_chunk(whisper_model.get(), audio)
+        tier_model, decode_options = governor.current()
+        start = time.perf_counter()
+        segments = transcribe_chunk(tier_model, audio, **decode_options)
+        governor.observe(time.perf_counter() - start, len(audio) / samplerate)
+        return segments
+
+    def diarize_stage(audio):
+        # runs in the single diarization stage thread, so chunks update the index in order
+        if speaker_index is None:
+            return diarize(audio, samplerate)
+        turns, embeddings = diarize(audio, samplerate, return_embeddings=True)
+        return speaker_index.label_turns(turns, embeddings)
+    chunk_samples = int(chunk_duration * samplerate)
+    if LIVE_CHUNKING == "vad":
+        # the chunker reads short blocks; the ring buffer still holds AUDIO_BUFFER_CHUNKS chunks of audio
+        block = block_samples(samplerate)
+        ring = AudioRingBuffer(block, chunks=max(2, AUDIO_BUFFER_CHUNKS * chunk_samples // block))
+        chunker = PauseChunker(ring.read_chunk, samplerate, max_seconds=chunk_duration)
+        next_chunk = chunker.read_chunk
+    else:
+        ring = AudioRingBuffer(chunk_samples, chunks=AUDIO_BUFFER_CHUNKS)
+        chunker = None
+        next_chunk = ring.read_chunk
     chunk_index = 0
-    with sd.InputStream(samplerate=samplerate, channels=1, callback=audio_callback):
-        while True:
-            frames = []
-            for _ in range(int(samplerate / 1024 * chunk_duration)):
-                frames.append(q.get())
-
-            filename = f"assets/temp_chunks/chunk_{chunk_index}.wav"
-
-            with sf.SoundFile(filename, mode='w', samplerate=samplerate, channels=1, subtype='PCM_16') as f:
-                for frame in frames:
-                    f.write(frame)
-
-            # Transcription
-            result = model.transcribe(filename, language="en", task="transcribe")
-            segments = result.get("segments", [])
-
-            # Diarization
-            diarization = pipeline(filename)
-            speaker_turns = []
-            for turn, _, speaker in diarization.itertracks(yield_label=True):
-                speaker_turns.append({
-                    "speaker": speaker,
-                    "start": turn.start,
-                    "end": turn.end
-                })
-
-            labeled_transcript = assign_speakers(segments, speaker_turns)
-
-            chunk_index += 1
-            yield labeled_transcript
+    reported_dropped = 0
+
+    def read_chunk():
+        nonlocal chunk_index, reported_dropped
+        audio = next_chunk(timeout=1.0)  # float32 view, valid until the next call
+        if audio is None:
+            return None
+        if ring.dropped > reported_dropped:
+            # ring.dropped is a running total: only warn when more audio was lost
+            reported_dropped = ring.dropped
+            print(f"⚠️ Transcription is falling behind, {ring.dropped / samplerate:.1f}s of audio dropped so far")
+        if SAVE_AUDIO_CHUNKS:
+            save_chunk(audio, samplerate, chunk_index)
+        chunk_index += 1
+        return audio
+
+    # capture, ASR, diarization and alignment run concurrently on consecutive chunks, so
+    # ASR and diarization of the same chunk overlap. With the OpenMP backend torch's thread
+    # count is per calling thread, so each stage sets its own share of the cores.
+    live = LivePipeline(
+        read_chunk,
+        transcribe_stage,
+        diarize_stage,
+        lambda segments, turns: assign_speakers(segments, turns, relabel=speaker_index is None),
+        stage_setup={
+            "asr": lambda: set_thread_torch_threads(ASR_THREADS),
+            "diarization": lambda: set_thread_torch_threads(DIARIZATION_THREADS),
+        },
+    )
+    with sd.InputStream(samplerate=samplerate, channels=1, dtype="float32", callback=ring.callback):
+        live.start()
+        try:
+            for labeled_transcript in live.results():
+                live_pipeline_metrics.update(live.metrics(), dropped_audio_seconds=ring.dropped / samplerate)
+                if governor is not None:
+                    live_pipeline_metrics.update(
+                        whisper_tier=governor.tier.name, asr_rtf=governor.last_rtf, tier_switches=len(governor.switches)
+                    )
+                if chunker is not None:
+                    live_pipeline_metrics.update(
+                        speech_seconds=chunker.speech_seconds, skipped_silence_seconds=chunker.skipped_seconds
+                    )
+                yield labeled_transcript
+        finally:
+            live.stop()
+            if DIARIZATION_WORKER == "process":
+                diarize.close()
@@ -0,0 +1,40 @@
+# modules/streaming.py
+# Token streaming for the apps: generation runs in a background thread and feeds a
+# TextIteratorStreamer, the caller iterates over decoded text as it arrives.
+import os
+import threading
+
+import torch
+from transformers import TextIteratorStreamer
+
+STREAM_TIMEOUT = float(os.getenv("STREAM_TIMEOUT", "600"))  # max seconds between two tokens
+
+
+def streams_tokens(generate_args):
+    # Beam search only knows its best sequence at the end, so only greedy decodes stream
+    return generate_args.get("num_beams", 1) == 1
+
+
+def stream_generate(tokenizer, generate):
+    # generate(streamer) runs the decode and puts the prompt, then every new token, into
+    # the streamer (model.generate(..., streamer=streamer) does exactly that).
+    # Yields decoded text pieces; errors in the generation thread are re-raised here.
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=STREAM_TIMEOUT)
+    errors = []
+
+    def run():
+        try:
+            with torch.no_grad():
+                generate(streamer)
+        except Exception as e:
+            errors.append(e)
+            streamer.end()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    for piece in streamer:
+        if piece:
+            yield piece
+    thread.join()
+    if errors:
+        raise errors[0]
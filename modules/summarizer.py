@@ -1,28 +1,230 @@
 # modules/summarizer.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 import torch
 
-def load_meeting_summarizer():
-    model_name = "knkarthick/MEETING_SUMMARY"
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+from modules.quantization import INFERENCE_PRECISION, quantize_model
+from modules.model_provider import register_model
+from modules.result_cache import cached_result, cached_results, cached_stream
+from modules.streaming import stream_generate, streams_tokens
+from modules.generation_profiles import measure_throughput, resolve_generation_args
+from modules.text_windows import count_tokens, split_into_windows
+
+# Long meetings are summarized map-reduce style: the transcript is split along speaker
+# turns into windows that fit the model, the windows are summarized as one batch and
+# the partial summaries are summarized again until a single summary remains.
+MODEL_NAME = "knkarthick/MEETING_SUMMARY"
+MAX_INPUT_TOKENS = 1024
+SUMMARY_WINDOW_TOKENS = int(os.getenv("SUMMARY_WINDOW_TOKENS", str(MAX_INPUT_TOKENS)))
+SUMMARY_WINDOW_OVERLAP = int(os.getenv("SUMMARY_WINDOW_OVERLAP", "64"))  # tokens of trailing turns repeated
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "4"))
+MAX_REDUCE_DEPTH = 5
+ROLLING_SUMMARY_EVERY = int(os.getenv("ROLLING_SUMMARY_EVERY", "3"))  # live chunks between updates
+
+def window_budget(window_tokens):
+    # Transcript tokens that fit one model input: the model reads at most MAX_INPUT_TOKENS
+    # including <s> and </s>, which count_tokens leaves out
+    return min(window_tokens, MAX_INPUT_TOKENS) - 2
+
+def partial_summary_args(generate_args):
+    # Window summaries in the map step are shorter than the final one
+    return dict(
+        generate_args,
+        max_length=min(generate_args["max_length"], 128),
+        min_length=min(generate_args["min_length"], 20),
+    )
+
+def load_meeting_summarizer(precision=None):
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
+    model.eval()
+    model = quantize_model(model, precision)  # INFERENCE_PRECISION=int8 for CPU nodes
     return tokenizer, model
 
-tokenizer, model = load_meeting_summarizer()
+summarizer_model = register_model(
+    "Meeting summarizer",
+    load_meeting_summarizer,
+    on_load=lambda loaded: measure_throughput("summary", *loaded),
+)
+
+def _cache_params(generate_args, window_tokens, overlap_tokens):
+    return {
+        "generate_args": generate_args,
+        "window_tokens": window_tokens,
+        "overlap_tokens": overlap_tokens,
+        "precision": INFERENCE_PRECISION,
+    }
+
+# profile: "quality" / "balanced" / "fast"; or let latency_budget (seconds) pick one
+def generate_summary(text, window_tokens=SUMMARY_WINDOW_TOKENS, overlap_tokens=SUMMARY_WINDOW_OVERLAP,
+                     profile=None, latency_budget=None):
+    profile, generate_args = resolve_generation_args("summary", profile, latency_budget)
+    return cached_result(
+        "summary", text, MODEL_NAME, _cache_params(generate_args, window_tokens, overlap_tokens),
+        lambda: _generate_summary(text, window_tokens, overlap_tokens, generate_args),
+    )
+
+# Several independent summaries at once (e.g. from concurrent users): the texts that fit
+# one window run together in padded batches, longer ones go through map-reduce
+def generate_summaries(texts, window_tokens=SUMMARY_WINDOW_TOKENS, overlap_tokens=SUMMARY_WINDOW_OVERLAP,
+                       profile=None, latency_budget=None):
+    profile, generate_args = resolve_generation_args("summary", profile, latency_budget)
+    return cached_results(
+        "summary", texts, MODEL_NAME, _cache_params(generate_args, window_tokens, overlap_tokens),
+        lambda missing: _generate_summaries(missing, window_tokens, overlap_tokens, generate_args),
+    )
+
+def _generate_summaries(texts, window_tokens, overlap_tokens, generate_args):
+    tokenizer, model = summarizer_model.get()
+    results = [None] * len(texts)
+    fits = [i for i, text in enumerate(texts) if count_tokens(tokenizer, text) <= window_budget(window_tokens)]
+    for i, summary in zip(fits, summarize_batch_with(tokenizer, model, [texts[i] for i in fits], **generate_args)):
+        results[i] = summary
+    for i, text in enumerate(texts):
+        if results[i] is None:
+            results[i] = generate_long_summary(text, window_tokens, overlap_tokens, generate_args)
+    return results
+
+def summary_streams(profile=None, latency_budget=None):
+    _, generate_args = resolve_generation_args("summary", profile, latency_budget)
+    return streams_tokens(generate_args)
+
+# Same as generate_summary, but yields the summary in pieces as the tokens decode.
+# Beam search profiles keep their quality: their summary comes as a single piece.
+def stream_summary(text, window_tokens=SUMMARY_WINDOW_TOKENS, overlap_tokens=SUMMARY_WINDOW_OVERLAP,
+                   profile=None, latency_budget=None):
+    profile, generate_args = resolve_generation_args("summary", profile, latency_budget)
+    if not streams_tokens(generate_args):
+        yield generate_summary(text, window_tokens, overlap_tokens, profile=profile)
+        return
+    yield from cached_stream(
+        "summary", text, MODEL_NAME, _cache_params(generate_args, window_tokens, overlap_tokens),
+        lambda: _stream_summary(text, window_tokens, overlap_tokens, generate_args),
+    )
 
-def generate_summary(text):
-    inputs = tokenizer([text], return_tensors="pt", truncation=True, max_length=1024)
-    with torch.no_grad():
-        summary_ids = model.generate(
+def _stream_summary(text, window_tokens, overlap_tokens, generate_args):
+    tokenizer, model = summarizer_model.get()
+    if count_tokens(tokenizer, text) > window_budget(window_tokens):
+        # the map steps run as usual, only the final summary is streamed
+        text = "\n".join(reduce_to_one_window(text, window_tokens, overlap_tokens, generate_args))
+    inputs = tokenizer([text], return_tensors="pt", truncation=True, max_length=MAX_INPUT_TOKENS)
+    yield from stream_generate(
+        tokenizer,
+        lambda streamer: model.generate(
             inputs["input_ids"],
-            max_length=256,
-            min_length=50,
-            length_penalty=2.0,
-            num_beams=4,
-            early_stopping=True
+            attention_mask=inputs["attention_mask"],
+            streamer=streamer,
+            **generate_args
+        ),
+    )
+
+def _generate_summary(text, window_tokens, overlap_tokens, generate_args):
+    tokenizer, model = summarizer_model.get()
+    if count_tokens(tokenizer, text) <= window_budget(window_tokens):
+        return summarize_with(tokenizer, model, text, generate_args)
+    return generate_long_summary(text, window_tokens, overlap_tokens, generate_args)
+
+def summarize_with(tokenizer, model, text, generate_args=None):
+    if generate_args is None:
+        _, generate_args = resolve_generation_args("summary", "quality")
+    return summarize_batch_with(tokenizer, model, [text], **generate_args)[0]
+
+def summarize_batch_with(tokenizer, model, texts, batch_size=SUMMARY_BATCH_SIZE, **generate_args):
+    summaries = []
+    for start in range(0, len(texts), batch_size):
+        inputs = tokenizer(
+            texts[start:start + batch_size],
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=MAX_INPUT_TOKENS,
         )
-    summary = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-    return summary
+        with torch.no_grad():
+            summary_ids = model.generate(
+                inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+                **generate_args
+            )
+        summaries.extend(tokenizer.batch_decode(summary_ids, skip_special_tokens=True))
+    return summaries
+
+def generate_long_summary(text, window_tokens=SUMMARY_WINDOW_TOKENS, overlap_tokens=SUMMARY_WINDOW_OVERLAP,
+                          generate_args=None):
+    if generate_args is None:
+        _, generate_args = resolve_generation_args("summary", "quality")
+    tokenizer, model = summarizer_model.get()
+    turns = reduce_to_one_window(text, window_tokens, overlap_tokens, generate_args)
+    return summarize_with(tokenizer, model, "\n".join(turns), generate_args)
+
+def reduce_to_one_window(text, window_tokens, overlap_tokens, generate_args):
+    # Map steps of generate_long_summary: returns turns that fit a single window
+    tokenizer, model = summarizer_model.get()
+    turns = [line.strip() for line in text.split("\n") if line.strip()]
+    for _ in range(MAX_REDUCE_DEPTH):
+        windows = split_into_windows(tokenizer, turns, window_budget(window_tokens), overlap_tokens)
+        if len(windows) == 1:
+            break
+        # map: every window in padded batches; the partial summaries become the next level's turns
+        turns = summarize_batch_with(tokenizer, model, windows, **partial_summary_args(generate_args))
+    return turns
+
+class RollingSummarizer:
+    # Running summary of a live meeting. Every `update_every` chunks only the new lines
+    # plus the previous summary are summarized, so the cost per update stays constant
+    # and the end-of-meeting summary only needs the last few chunks. Updates run in a
+    # background thread, so the live transcription loop never waits for beam search.
+    def __init__(self, update_every=ROLLING_SUMMARY_EVERY):
+        self.update_every = update_every
+        self.summary = ""
+        self.pending_lines = []
+        self.chunks_since_update = 0
+        self.total_lines = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rolling-summary")
+        self._update = None  # (future, lines) of the running background update
+
+    def add_chunk(self, labeled_lines):
+        # Returns the latest finished summary right away
+        self.pending_lines.extend(labeled_lines)
+        self.total_lines += len(labeled_lines)
+        self.chunks_since_update += 1
+        if self.chunks_since_update >= self.update_every and self._collect_update(wait=False):
+            lines, self.pending_lines = self.pending_lines, []
+            self.chunks_since_update = 0
+            self._update = (self._executor.submit(self._summarize, lines), lines)
+        return self.summary
+
+    def flush(self):
+        # Waits for a running update, then summarizes whatever is still pending
+        self._collect_update(wait=True)
+        if self.pending_lines:
+            self._summarize(self.pending_lines)
+            self.pending_lines = []
+        self.chunks_since_update = 0
+        return self.summary
+
+    def _summarize(self, lines):
+        previous = [self.summary] if self.summary else []
+        self.summary = generate_summary("\n".join(previous + lines))
+
+    def _collect_update(self, wait):
+        # True once no update is running; a failed update's lines go back to pending
+        if self._update is None:
+            return True
+        future, lines = self._update
+        if not wait and not future.done():
+            return False
+        self._update = None
+        try:
+            future.result()
+        except Exception as e:
+            print(f"⚠️ Live summary update failed: {e}")
+            self.pending_lines = lines + self.pending_lines
+        return True
+
+    def covers(self, transcript_lines):
+        return self.total_lines > 0 and self.total_lines == len(transcript_lines)
 
 def clean_transcript(transcript_lines):
     return " ".join(line.split("]")[-1].strip() for line in transcript_lines)
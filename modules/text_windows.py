@@ -0,0 +1,49 @@
+# modules/text_windows.py
+# Splitting transcripts along speaker turns into windows that fit a model's context
+
+
+def count_tokens(tokenizer, text):
+    return len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+
+def _split_long_turn(tokenizer, turn, budget):
+    # A single turn longer than the window is cut at word boundaries
+    pieces, current, current_len = [], [], 0
+    for word in turn.split():
+        word_len = count_tokens(tokenizer, " " + word)
+        if current and current_len + word_len > budget:
+            pieces.append(" ".join(current))
+            current, current_len = [], 0
+        current.append(word)
+        current_len += word_len
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def split_into_windows(tokenizer, turns, window_tokens, overlap_tokens=0):
+    # Greedily packs whole turns into windows of at most `window_tokens` tokens; the last
+    # turns of each window (up to `overlap_tokens`) are repeated at the start of the next
+    units = []
+    for turn in turns:
+        if count_tokens(tokenizer, turn) > window_tokens:
+            units.extend(_split_long_turn(tokenizer, turn, window_tokens))
+        else:
+            units.append(turn)
+    lengths = [count_tokens(tokenizer, unit) + 1 for unit in units]  # +1 for the newline
+
+    windows, start = [], 0
+    while start < len(units):
+        end, total = start, 0
+        while end < len(units) and (end == start or total + lengths[end] <= window_tokens):
+            total += lengths[end]
+            end += 1
+        windows.append("\n".join(units[start:end]))
+        if end >= len(units):
+            break
+        next_start, overlap = end, 0
+        while next_start - 1 > start and overlap + lengths[next_start - 1] <= overlap_tokens:
+            next_start -= 1
+            overlap += lengths[next_start]
+        start = next_start
+    return windows
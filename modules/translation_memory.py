@@ -0,0 +1,129 @@
+# modules/translation_memory.py
+import hashlib
+import os
+import time
+
+from modules import sqlite_db
+
+# Persistent translation memory: finished translations keyed by (hash(text), src, tgt,
+# precision); an int8 model's translation isn't served to an fp32 node and vice versa
+DB_PATH = os.getenv("TRANSLATION_MEMORY_DB", "translation_memory.db")
+MAX_ENTRIES = int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", "50000"))
+EVICT_CHECK_INTERVAL = 100  # check the size bound every N stores
+# modules.quantization's setting, read here so chatroom_db (text_hash) doesn't import torch
+INFERENCE_PRECISION = os.getenv("INFERENCE_PRECISION", "fp32").lower()
+
+_stores_since_check = 0
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _create_schema(conn):
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(translation_memory)")]
+    if columns and "precision" not in columns:
+        # entries from before precision was part of the key can't be attributed
+        conn.execute("DROP TABLE translation_memory")
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS translation_memory (
+                text_hash TEXT NOT NULL,
+                src_lang TEXT NOT NULL,
+                tgt_lang TEXT NOT NULL,
+                precision TEXT NOT NULL,
+                translated_text TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (text_hash, src_lang, tgt_lang, precision))"""
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_translation_memory_last_used ON translation_memory (last_used)"
+    )
+
+
+def _connect():
+    return sqlite_db.connect(DB_PATH, _create_schema)
+
+
+def lookup_many(texts, src_lang, tgt_lang):
+    # Returns {text: translation} for every text already in the memory
+    hashes = {text_hash(text): text for text in set(texts)}
+    if not hashes:
+        return {}
+    found = {}
+    conn = _connect()
+    try:
+        keys = list(hashes)
+        for start in range(0, len(keys), 500):  # stay under SQLite's variable limit
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT text_hash, translated_text FROM translation_memory WHERE src_lang = ? AND tgt_lang = ? AND precision = ? AND text_hash IN ({placeholders})",
+                (src_lang, tgt_lang, INFERENCE_PRECISION, *batch),
+            ).fetchall()
+            for hashed, translated in rows:
+                found[hashes[hashed]] = translated
+        if found:
+            now = time.time()
+            conn.executemany(
+                "UPDATE translation_memory SET last_used = ? WHERE text_hash = ? AND src_lang = ? AND tgt_lang = ? AND precision = ?",
+                [(now, text_hash(text), src_lang, tgt_lang, INFERENCE_PRECISION) for text in found],
+            )
+            conn.commit()
+    finally:
+        conn.close()
+    _stats["hits"] += len(found)
+    _stats["misses"] += len(hashes) - len(found)
+    return found
+
+
+def lookup(text, src_lang, tgt_lang):
+    return lookup_many([text], src_lang, tgt_lang).get(text)
+
+
+def store_many(pairs, src_lang, tgt_lang):
+    # pairs: iterable of (source_text, translated_text)
+    global _stores_since_check
+    now = time.time()
+    rows = [(text_hash(text), src_lang, tgt_lang, INFERENCE_PRECISION, translated, now) for text, translated in pairs]
+    if not rows:
+        return
+    conn = _connect()
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO translation_memory (text_hash, src_lang, tgt_lang, precision, translated_text, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.commit()
+        _stats["stores"] += len(rows)
+        _stores_since_check += len(rows)
+        if _stores_since_check >= EVICT_CHECK_INTERVAL:
+            _stores_since_check = 0
+            _evict(conn)
+    finally:
+        conn.close()
+
+
+def store(text, translated_text, src_lang, tgt_lang):
+    store_many([(text, translated_text)], src_lang, tgt_lang)
+
+
+def _evict(conn):
+    # Drop least recently used entries down to 90% of the bound
+    count = conn.execute("SELECT COUNT(*) FROM translation_memory").fetchone()[0]
+    if count <= MAX_ENTRIES:
+        return
+    excess = count - int(MAX_ENTRIES * 0.9)
+    conn.execute(
+        "DELETE FROM translation_memory WHERE rowid IN (SELECT rowid FROM translation_memory ORDER BY last_used ASC LIMIT ?)",
+        (excess,),
+    )
+    conn.commit()
+    _stats["evictions"] += excess
+
+
+def get_translation_memory_stats():
+    stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
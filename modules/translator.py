@@ -1,15 +1,260 @@
 # modules/translator.py
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import torch
 from transformers import MarianMTModel, MarianTokenizer
 
-def load_translation_model(src_lang="en", tgt_lang="fr"):
+from modules import translation_memory
+from modules.quantization import quantize_model, model_size_mb
+
+# Process-wide registry of loaded MarianMT models, keyed by (src_lang, tgt_lang).
+# Bounded by a model count and, optionally, by the total size of the weights in MB.
+MAX_CACHED_MODELS = int(os.getenv("TRANSLATION_CACHE_SIZE", "4"))
+MAX_CACHE_MB = float(os.getenv("TRANSLATION_CACHE_MAX_MB", "0"))  # 0 = no memory cap
+
+_model_cache = OrderedDict()  # (src_lang, tgt_lang) -> (tokenizer, model, size_mb)
+_cache_lock = threading.Lock()
+_load_locks = {}
+_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "loads": 0, "load_time": 0.0}
+
+# Identical translations already running in another thread: (hash, src, tgt) -> Future
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+TRANSLATION_BATCH_SIZE = int(os.getenv("TRANSLATION_BATCH_SIZE", "16"))
+MAX_SEGMENT_TOKENS = 400  # stay well below Marian's 512-token input limit
+
+SENTENCE_END = re.compile(r"(?<=[.!?。！？])\s+")
+
+
+def load_translation_model(src_lang="en", tgt_lang="fr", precision=None):
     model_name = f"Helsinki-NLP/opus-mt-{src_lang}-{tgt_lang}"
     tokenizer = MarianTokenizer.from_pretrained(model_name)
     model = MarianMTModel.from_pretrained(model_name)
+    model.eval()
+    model = quantize_model(model, precision)
     return tokenizer, model
 
-def translate_text(text, src_lang="en", tgt_lang="fr"):
-    tokenizer, model = load_translation_model(src_lang, tgt_lang)
+
+def _cache_size_mb():
+    return sum(size_mb for _, _, size_mb in _model_cache.values())
+
+
+def _evict_if_needed():
+    # Drop least recently used models until both the count and memory caps hold.
+    # The most recent entry is always kept, even if it alone exceeds the memory cap.
+    while len(_model_cache) > 1 and (
+        len(_model_cache) > MAX_CACHED_MODELS
+        or (MAX_CACHE_MB > 0 and _cache_size_mb() > MAX_CACHE_MB)
+    ):
+        _model_cache.popitem(last=False)
+        _cache_stats["evictions"] += 1
+
+
+def get_translation_model(src_lang="en", tgt_lang="fr"):
+    key = (src_lang, tgt_lang)
+    with _cache_lock:
+        if key in _model_cache:
+            _model_cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            tokenizer, model, _ = _model_cache[key]
+            return tokenizer, model
+        _cache_stats["misses"] += 1
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    # Only one thread loads a given pair; the others wait and then reuse it
+    with load_lock:
+        with _cache_lock:
+            if key in _model_cache:
+                _model_cache.move_to_end(key)
+                tokenizer, model, _ = _model_cache[key]
+                return tokenizer, model
+
+        start = time.perf_counter()
+        tokenizer, model = load_translation_model(src_lang, tgt_lang)
+        elapsed = time.perf_counter() - start
+
+        with _cache_lock:
+            _cache_stats["loads"] += 1
+            _cache_stats["load_time"] += elapsed
+            _model_cache[key] = (tokenizer, model, model_size_mb(model))
+            _evict_if_needed()
+    return tokenizer, model
+
+
+def preload_translation_models(language_codes, pivot_lang="en"):
+    # Load both directions between the pivot language and every supported language,
+    # e.g. preload_translation_models(supported_languages.values())
+    for code in language_codes:
+        if code == pivot_lang:
+            continue
+        for src_lang, tgt_lang in ((pivot_lang, code), (code, pivot_lang)):
+            try:
+                get_translation_model(src_lang, tgt_lang)
+            except Exception as e:
+                print(f"⚠️ Could not preload translation model {src_lang}-{tgt_lang}: {e}")
+
+
+def get_translation_cache_stats():
+    with _cache_lock:
+        stats = dict(_cache_stats)
+        stats["cached_pairs"] = [f"{src}-{tgt}" for src, tgt in _model_cache]
+        stats["cached_mb"] = round(_cache_size_mb(), 1)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    stats["avg_load_time"] = stats["load_time"] / stats["loads"] if stats["loads"] else 0.0
+    return stats
+
+
+def clear_translation_cache():
+    with _cache_lock:
+        _model_cache.clear()
+
+
+def _run_translation(text, src_lang, tgt_lang):
+    tokenizer, model = get_translation_model(src_lang, tgt_lang)
     inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True)
-    translated = model.generate(**inputs)
+    with torch.no_grad():
+        translated = model.generate(**inputs)
     output = tokenizer.batch_decode(translated, skip_special_tokens=True)
     return output[0]
+
+
+def translate_text(text, src_lang="en", tgt_lang="fr"):
+    if not text.strip():
+        return text
+
+    cached = translation_memory.lookup(text, src_lang, tgt_lang)
+    if cached is not None:
+        return cached
+
+    # Single-flight: if the same text is already being translated, wait for that result
+    key = (translation_memory.text_hash(text), src_lang, tgt_lang)
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        is_leader = flight is None
+        if is_leader:
+            flight = _inflight[key] = Future()
+    if not is_leader:
+        return flight.result()
+
+    try:
+        output = _run_translation(text, src_lang, tgt_lang)
+        translation_memory.store(text, output, src_lang, tgt_lang)
+        flight.set_result(output)
+        return output
+    except Exception as e:
+        flight.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def speaker_prefix_pattern(speaker_names=()):
+    # "[Speaker 1] ..." from the live transcriber, or "John Smith: ..." for the names given
+    # in the rename step; any other "Word:" at the start of a line is part of the text
+    names = sorted({name.strip() for name in speaker_names if name.strip()}, key=len, reverse=True)
+    alternatives = [r"\[[^\]]*\]:?"] + [re.escape(name) + ":" for name in names]
+    return re.compile(rf"^\s*(?:{'|'.join(alternatives)})\s*")
+
+
+SPEAKER_PREFIX = speaker_prefix_pattern()
+
+
+def split_speaker_prefix(line, prefix=SPEAKER_PREFIX):
+    match = prefix.match(line)
+    if not match:
+        return "", line.strip()
+    return match.group(0), line[match.end():].strip()
+
+
+def _split_long_sentence(tokenizer, sentence, max_tokens):
+    # Fall back to word boundaries for sentences the model could not take in one go
+    pieces, current, current_len = [], [], 0
+    for word in sentence.split():
+        word_len = len(tokenizer.tokenize(word))
+        if current and current_len + word_len > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_len = [], 0
+        current.append(word)
+        current_len += word_len
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def split_sentences(tokenizer, text, max_tokens=MAX_SEGMENT_TOKENS):
+    segments = []
+    for sentence in SENTENCE_END.split(text.strip()):
+        if not sentence:
+            continue
+        if len(tokenizer.tokenize(sentence)) > max_tokens:
+            segments.extend(_split_long_sentence(tokenizer, sentence, max_tokens))
+        else:
+            segments.append(sentence)
+    return segments
+
+
+def translate_batch(texts, src_lang="en", tgt_lang="fr", batch_size=TRANSLATION_BATCH_SIZE):
+    results = [""] * len(texts)
+
+    remembered = translation_memory.lookup_many(
+        [text for text in texts if text.strip()], src_lang, tgt_lang
+    )
+    for i, text in enumerate(texts):
+        if text in remembered:
+            results[i] = remembered[text]
+
+    todo = [i for i, text in enumerate(texts) if text.strip() and text not in remembered]
+    if not todo:
+        return results
+    tokenizer, model = get_translation_model(src_lang, tgt_lang)
+
+    # Sort by token length so each batch holds similarly sized inputs and
+    # generate() wastes as little work as possible on padding
+    lengths = {i: len(tokenizer.tokenize(texts[i])) for i in todo}
+    todo.sort(key=lambda i: lengths[i])
+
+    for start in range(0, len(todo), batch_size):
+        bucket = todo[start:start + batch_size]
+        inputs = tokenizer(
+            [texts[i] for i in bucket], return_tensors="pt", padding=True, truncation=True
+        )
+        with torch.no_grad():
+            translated = model.generate(**inputs)
+        decoded = tokenizer.batch_decode(translated, skip_special_tokens=True)
+        for i, output in zip(bucket, decoded):
+            results[i] = output
+        translation_memory.store_many(
+            [(texts[i], results[i]) for i in bucket], src_lang, tgt_lang
+        )
+    return results
+
+
+def translate_transcript(transcript_lines, src_lang="en", tgt_lang="fr", batch_size=TRANSLATION_BATCH_SIZE,
+                         speaker_names=()):
+    # Translate every sentence of every line; speaker prefixes are kept as-is.
+    # speaker_names: the names speakers were renamed to, so "Name:" prefixes are kept too
+    tokenizer, _ = get_translation_model(src_lang, tgt_lang)
+    prefix_pattern = speaker_prefix_pattern(speaker_names)
+
+    prefixes, line_segments, segments = [], [], []
+    for line in transcript_lines:
+        prefix, body = split_speaker_prefix(line, prefix_pattern)
+        pieces = split_sentences(tokenizer, body)
+        prefixes.append(prefix)
+        line_segments.append(range(len(segments), len(segments) + len(pieces)))
+        segments.extend(pieces)
+
+    translated = translate_batch(segments, src_lang, tgt_lang, batch_size=batch_size)
+
+    return [
+        prefix + " ".join(translated[i] for i in indexes)
+        for prefix, indexes in zip(prefixes, line_segments)
+    ]
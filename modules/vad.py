@@ -0,0 +1,166 @@
+# modules/vad.py
+# Energy / zero-crossing voice activity detection on the live capture audio, and a
+# chunker that turns the microphone stream into speech-only chunks cut at pauses.
+# Silence never reaches Whisper or pyannote, and words are no longer split by a
+# fixed 10 s boundary.
+import os
+
+import numpy as np
+
+VAD_MIN_CHUNK_SECONDS = float(os.getenv("VAD_MIN_CHUNK_SECONDS", "3"))
+VAD_PAUSE_SECONDS = float(os.getenv("VAD_PAUSE_SECONDS", "0.4"))  # silence that ends a chunk
+VAD_ENERGY_MARGIN_DB = float(os.getenv("VAD_ENERGY_MARGIN_DB", "12"))  # speech vs. noise floor
+VAD_MIN_ENERGY_DB = float(os.getenv("VAD_MIN_ENERGY_DB", "-50"))  # dBFS, quieter is always silence
+
+FRAME_SECONDS = 0.025
+BLOCK_SECONDS = 0.25  # audio the chunker reads from the ring buffer at a time
+HANGOVER_SECONDS = 0.2  # frames after speech that still count as speech (word endings)
+UNVOICED_ZCR = 0.25  # quiet frames this noisy are fricatives ("s", "f"), not silence
+NOISE_FLOOR_RISE_DB = 0.5  # per block, so the floor follows a noisier room
+SILENCE_FLUSH_SECONDS = 1.5  # a short utterance is emitted after this much silence
+TRAILING_SILENCE_SECONDS = 0.2  # silence kept at the end of a chunk
+
+
+def frame_samples(samplerate):
+    return int(FRAME_SECONDS * samplerate)
+
+
+def block_samples(samplerate):
+    # a whole number of frames, so blocks never split a frame
+    return frame_samples(samplerate) * round(BLOCK_SECONDS / FRAME_SECONDS)
+
+
+class VoiceActivityDetector:
+    def __init__(self, samplerate, energy_margin_db=VAD_ENERGY_MARGIN_DB, min_energy_db=VAD_MIN_ENERGY_DB):
+        self.frame_samples = frame_samples(samplerate)
+        self.energy_margin_db = energy_margin_db
+        self.min_energy_db = min_energy_db
+        self.hangover_frames = int(HANGOVER_SECONDS / FRAME_SECONDS)
+        self.noise_floor_db = None
+        self._since_speech = self.hangover_frames + 1  # frames since the last speech frame
+
+    def features(self, audio):
+        # (energy in dBFS, zero-crossing rate) of every whole frame
+        frames = audio[:len(audio) // self.frame_samples * self.frame_samples].reshape(-1, self.frame_samples)
+        energy = 10 * np.log10(np.mean(np.square(frames, dtype=np.float64), axis=1) + 1e-12)
+        zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+        return energy, zcr
+
+    def speech_frames(self, audio):
+        # Boolean speech mask, one entry per frame; call with consecutive blocks of the stream
+        energy, zcr = self.features(audio)
+        if not len(energy):
+            return np.zeros(0, dtype=bool)
+        quietest = float(energy.min())
+        if self.noise_floor_db is None or quietest < self.noise_floor_db:
+            self.noise_floor_db = quietest
+        else:
+            self.noise_floor_db += NOISE_FLOOR_RISE_DB
+        threshold = max(self.min_energy_db, self.noise_floor_db + self.energy_margin_db)
+        speech = (energy > threshold) | ((energy > threshold - 6) & (zcr > UNVOICED_ZCR))
+
+        # hangover: frames shortly after speech (also from the previous block) count as speech
+        index = np.arange(len(speech))
+        last_speech = np.maximum.accumulate(np.where(speech, index, -self._since_speech))
+        since = index - last_speech
+        self._since_speech = int(since[-1]) + 1
+        return since <= self.hangover_frames
+
+
+class PauseChunker:
+    # read_block(timeout) -> block_samples() of float32 audio or None (AudioRingBuffer.read_chunk).
+    # read_chunk() reads one block per call and returns a speech chunk when one is complete,
+    # otherwise None. Chunks are at least min_seconds long unless followed by a long
+    # silence, at most max_seconds, and cut at a pause whenever there is one. A chunk is a
+    # view that stays valid until the next call, like AudioRingBuffer's.
+    def __init__(self, read_block, samplerate, max_seconds,
+                 min_seconds=VAD_MIN_CHUNK_SECONDS, pause_seconds=VAD_PAUSE_SECONDS, vad=None):
+        self.read_block = read_block
+        self.samplerate = samplerate
+        self.vad = vad or VoiceActivityDetector(samplerate)
+        self.frame_samples = self.vad.frame_samples
+        # all lengths in whole frames, so cuts line up with the speech mask
+        frames = lambda seconds: int(seconds * samplerate) // self.frame_samples * self.frame_samples
+        block = block_samples(samplerate)
+        self.max_samples = max(frames(max_seconds), block)
+        self.min_samples = min(frames(min_seconds), self.max_samples)
+        self.pause_samples = frames(pause_seconds)
+        self.flush_samples = frames(SILENCE_FLUSH_SECONDS)
+        self.tail_samples = frames(TRAILING_SILENCE_SECONDS)
+        # two buffers: the chunk handed out stays intact while the next one fills the other
+        self._buffers = [np.zeros(self.max_samples + block, dtype=np.float32) for _ in range(2)]
+        self._active = 0
+        self._speech = [np.zeros((self.max_samples + block) // self.frame_samples, dtype=bool) for _ in range(2)]
+        self._length = 0  # samples in the active buffer
+        self._silence = 0  # trailing silent samples in the active buffer
+        self._preroll = None  # last silent block, so word onsets aren't clipped
+        self.speech_seconds = 0.0
+        self.skipped_seconds = 0.0
+        self.chunks = 0
+
+    def read_chunk(self, timeout=1.0):
+        block = self.read_block(timeout=timeout)
+        if block is None:
+            return None
+        speech = self.vad.speech_frames(block)
+        if self._length == 0 and not speech.any():
+            self.skipped_seconds += len(block) / self.samplerate
+            self._preroll = block.copy()  # the ring buffer reuses the block's memory
+            return None
+
+        if self._length == 0 and self._preroll is not None:
+            self._append(self._preroll, np.zeros(len(self._preroll) // self.frame_samples, dtype=bool))
+            self.skipped_seconds -= len(self._preroll) / self.samplerate
+            self._preroll = None
+        self._append(block, speech)
+
+        if self._silence >= self.pause_samples and (self._length >= self.min_samples or self._silence >= self.flush_samples):
+            # pause after enough speech: cut here, keeping a little of the silence
+            return self._emit(self._length - self._silence + min(self._silence, self.tail_samples))
+        if self._length >= self.max_samples:
+            return self._emit(self._best_cut())
+        return None
+
+    def _append(self, block, speech):
+        buffer, mask = self._buffers[self._active], self._speech[self._active]
+        frame = self._length // self.frame_samples
+        buffer[self._length:self._length + len(block)] = block
+        mask[frame:frame + len(speech)] = speech
+        self._length += len(block)
+        if speech.any():
+            self._silence = (len(speech) - 1 - int(np.flatnonzero(speech)[-1])) * self.frame_samples
+        else:
+            self._silence += len(block)
+
+    def _best_cut(self):
+        # No pause long enough before max_seconds: cut in the middle of the longest silent
+        # stretch after min_seconds, or at max_seconds if there is none
+        mask = self._speech[self._active][:self.max_samples // self.frame_samples]
+        first = self.min_samples // self.frame_samples
+        silent = ~mask[first:]
+        if not silent.any():
+            return self.max_samples
+        # run lengths of the silent stretches
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], silent.astype(np.int8), [0]))))
+        starts, ends = edges[::2], edges[1::2]
+        longest = int(np.argmax(ends - starts))
+        return (first + (starts[longest] + ends[longest]) // 2) * self.frame_samples
+
+    def _emit(self, cut):
+        buffer, mask = self._buffers[self._active], self._speech[self._active]
+        rest = self._length - cut
+        # the audio after the cut starts the next chunk, in the other buffer
+        self._active = 1 - self._active
+        cut_frame = cut // self.frame_samples
+        self._buffers[self._active][:rest] = buffer[cut:self._length]
+        rest_mask = mask[cut_frame:self._length // self.frame_samples]
+        self._speech[self._active][:len(rest_mask)] = rest_mask
+        self._length = rest
+        self._silence = min(self._silence, rest)
+        if not rest_mask.any():
+            # only silence left over
+            self.skipped_seconds += rest / self.samplerate
+            self._length = self._silence = 0
+        self.speech_seconds += cut / self.samplerate
+        self.chunks += 1
+        return buffer[:cut]
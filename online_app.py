@@ -3,15 +3,25 @@ import sqlite3
 import streamlit as st
 import speech_recognition as sr
 import threading
+import os
 
-from modules.translator import translate_text
-
-from modules.summarizer import generate_summary
-from modules.ds_action_items import extract_action_items_with_deepseek
+from modules.inference_client import INFERENCE_SOCKET, translate_text
+from modules.chatroom_db import fan_out_translations, get_messages, get_translation
+from modules.action_items_config import action_items_available
+from modules.job_queue import ACTIVE_STATUSES, enqueue, get_job, get_latest_job, get_job_queue_stats
 
 st.set_page_config(page_title="Smart Meeting Assistant (Online)")
 
+
+# Summaries / action items are generated by job_worker.py, which loads the models;
+# the app only queues jobs and shows how the queue is doing
+with st.sidebar.expander("⚙️ Jobs"):
+    job_stats = get_job_queue_stats()
+    for status in ("pending", "running", "done", "failed"):
+        st.write(f"{status}: {job_stats.get(status, 0)}")
+
 default_language = "en"
+JOB_POLL_SECONDS = 1
 
 # language that support translation
 supported_languages = {
@@ -36,6 +46,19 @@ recognize_google_language_mapping = {
 }
 
 
+# Load every en <-> language translation model once per process so the first
+# message in each language doesn't pay for loading the model from disk
+# (with INFERENCE_SOCKET the inference daemon owns the models instead)
+@st.cache_resource
+def warm_translation_models():
+    from modules.translator import preload_translation_models  # local models only, keeps torch out of thin clients
+    preload_translation_models(supported_languages.values(), pivot_lang=default_language)
+
+
+if os.getenv("PRELOAD_TRANSLATION_MODELS", "false").lower() == "true" and not INFERENCE_SOCKET:
+    warm_translation_models()
+
+
 # Database setup
 def init_db():
     conn = sqlite3.connect("chatroom.db")
@@ -83,6 +106,19 @@ def init_db():
                 timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY(chatroom_id) REFERENCES chatrooms(id))"""
     )
+    # translations of messages / summaries / action items into each member language
+    # source_type: "message" (source_id = messages.id),
+    #              "summary" or "action_item" (source_id = chatrooms.id)
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS translations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source_type TEXT NOT NULL,
+                source_id INTEGER NOT NULL,
+                language TEXT NOT NULL,
+                source_hash TEXT NOT NULL,
+                content TEXT NOT NULL,
+                UNIQUE(source_type, source_id, language))"""
+    )
     conn.commit()
     conn.close()
 
@@ -206,6 +242,7 @@ def add_message(
     c = conn.cursor()
     c.execute("SELECT id FROM chatrooms WHERE name = ?", (chatroom_name,))
     chatroom = c.fetchone()
+    message_id = None
     if chatroom:
         chatroom_id = chatroom[0]
         c.execute(
@@ -219,26 +256,19 @@ def add_message(
                 translated_languag,
             ),
         )
+        message_id = c.lastrowid
         conn.commit()
     conn.close()
-
-
-def get_messages(chatroom_name):
-    conn = sqlite3.connect("chatroom.db")
-    c = conn.cursor()
-    c.execute("SELECT id FROM chatrooms WHERE name = ?", (chatroom_name,))
-    chatroom = c.fetchone()
-    if chatroom:
-        chatroom_id = chatroom[0]
-        c.execute(
-            "SELECT username, message, language, translated_message, translated_language, timestamp FROM messages WHERE chatroom_id = ? ORDER BY timestamp ASC",
-            (chatroom_id,),
+    if message_id is not None:
+        # readers of other languages translate from the default-language copy
+        fan_out_translations(
+            chatroom_name,
+            "message",
+            message_id,
+            translated_message,
+            translated_languag,
+            skip_languages=(language,),
         )
-        messages = c.fetchall()
-    else:
-        messages = []
-    conn.close()
-    return messages
 
 
 def get_current_timestamp():
@@ -250,60 +280,6 @@ def get_current_timestamp():
     return current_timestamp
 
 
-def update_chatroom_summary(chatroom_name, languages, summary):
-    conn = sqlite3.connect("chatroom.db")
-    c = conn.cursor()
-    c.execute("SELECT id FROM chatrooms WHERE name = ?", (chatroom_name,))
-    chatroom = c.fetchone()
-    if chatroom:
-        chatroom_id = chatroom[0]
-
-        c.execute(
-            "SELECT id FROM chatrooms_summary WHERE chatroom_id = ?",
-            (chatroom_id,),
-        )
-        chatrooms_summary = c.fetchone()
-        if chatrooms_summary:
-            c.execute(
-                "UPDATE chatrooms_summary SET summary = ? WHERE chatroom_id = ?",
-                (summary, chatroom_id),
-            )
-        else:
-            c.execute(
-                "INSERT INTO chatrooms_summary (chatroom_id, summary, languages) VALUES (?, ?, ?)",
-                (chatroom_id, summary, languages),
-            )
-        conn.commit()
-    conn.close()
-
-
-def update_chatroom_action_item(chatroom_name, languages, action_item):
-    conn = sqlite3.connect("chatroom.db")
-    c = conn.cursor()
-    c.execute("SELECT id FROM chatrooms WHERE name = ?", (chatroom_name,))
-    chatroom = c.fetchone()
-    if chatroom:
-        chatroom_id = chatroom[0]
-
-        c.execute(
-            "SELECT id FROM chatrooms_summary WHERE chatroom_id = ?",
-            (chatroom_id,),
-        )
-        chatrooms_summary = c.fetchone()
-        if chatrooms_summary:
-            c.execute(
-                "UPDATE chatrooms_summary SET action_item = ? WHERE chatroom_id = ?",
-                (action_item, chatroom_id),
-            )
-        else:
-            c.execute(
-                "INSERT INTO chatrooms_summary (chatroom_id, action_item, languages) VALUES (?, ?, ?)",
-                (chatroom_id, action_item, languages),
-            )
-        conn.commit()
-    conn.close()
-
-
 def get_chatroom_summary(chatroom_name):
     conn = sqlite3.connect("chatroom.db")
     conn.row_factory = sqlite3.Row
@@ -314,7 +290,7 @@ def get_chatroom_summary(chatroom_name):
         chatroom_id = chatroom[0]
 
         c.execute(
-            "SELECT summary, action_item, languages FROM chatrooms_summary WHERE chatroom_id = ?",
+            "SELECT chatroom_id, summary, action_item, languages FROM chatrooms_summary WHERE chatroom_id = ?",
             (chatroom_id,),
         )
         chatrooms_summary = c.fetchone()
@@ -327,7 +303,7 @@ def get_chatroom_summary(chatroom_name):
 
 # Function to fetch messages periodically
 # only message after current_time_stamp will be selected
-def get_messages_periodically(chatroom_name, current_time_stamp):
+def get_messages_periodically(chatroom_name, current_time_stamp, language=None):
     conn = sqlite3.connect("chatroom.db")
     c = conn.cursor()
     c.execute("SELECT id FROM chatrooms WHERE name = ?", (chatroom_name,))
@@ -335,8 +311,13 @@ def get_messages_periodically(chatroom_name, current_time_stamp):
     if chatroom:
         chatroom_id = chatroom[0]
         c.execute(
-            "SELECT username, message, language, translated_message, translated_language, timestamp FROM messages WHERE chatroom_id = ? AND timestamp > ? ORDER BY timestamp ASC",
+            """SELECT m.username, m.message, m.language, m.translated_message, m.translated_language, m.timestamp, t.content
+               FROM messages m
+               LEFT JOIN translations t
+                 ON t.source_type = 'message' AND t.source_id = m.id AND t.language = ?
+               WHERE m.chatroom_id = ? AND m.timestamp > ? ORDER BY m.timestamp ASC""",
             (
+                language,
                 chatroom_id,
                 current_time_stamp,
             ),
@@ -348,14 +329,63 @@ def get_messages_periodically(chatroom_name, current_time_stamp):
     return messages
 
 
+# Pick the message text in the reader's language, translating only if the
+# background fan-out hasn't produced it (e.g. the reader joined after it was sent)
+def get_display_message(msg, lang, translated_msg, translated_lang, fanned_out, user_language):
+    if user_language == lang:
+        return msg
+    if user_language == translated_lang:
+        return translated_msg
+    if fanned_out is not None:
+        return fanned_out
+    # use default lang and translate to target language
+    return translate_text(
+        translated_msg,
+        src_lang=translated_lang,
+        tgt_lang=user_language,
+    )
+
+
+# Same as above for the chatroom summary / action items
+def get_display_summary(chatroom_summary, field, user_language):
+    content = chatroom_summary[field]
+    if chatroom_summary["languages"] == user_language:
+        return content
+    fanned_out = get_translation(
+        field, chatroom_summary["chatroom_id"], user_language, content
+    )
+    if fanned_out is not None:
+        return fanned_out
+    return translate_text(
+        content,
+        src_lang=chatroom_summary["languages"],
+        tgt_lang=user_language,
+    )
+
+
 def show_message(chat_message):
     for message in chat_message:
         st.write(message)
 
 
-# format message to a specific format - pass to summarizar / deepseek for extract action item
-def format_message(user_name, message):
-    return user_name + " : " + message + "\n"
+# Status of a summary / action item job. Runs as a fragment that re-polls the queue
+# every JOB_POLL_SECONDS on its own, so the rest of the page renders right away; the
+# whole page reloads once, when the job finishes and its result is saved.
+@st.experimental_fragment(run_every=JOB_POLL_SECONDS)
+def show_job_status(job_id):
+    job = get_job(job_id)
+    seen_key = f"job_status_{job_id}"
+    previous = st.session_state.get(seen_key)
+    st.session_state[seen_key] = job["status"]
+    if job["status"] == "pending":
+        st.info("⏳ Queued, waiting for the job worker (python job_worker.py)...")
+    elif job["status"] == "running":
+        st.info("⚙️ Generating...")
+    elif job["status"] == "failed":
+        st.error(f"❌ Job failed: {job['error']}")
+    elif previous in ACTIVE_STATUSES:
+        # the worker has just written the result to chatrooms_summary
+        st.rerun()
 
 
 def start_recording():
@@ -530,54 +560,25 @@ elif menu == "Chatroom":
                         # user can
                         # 1 "Summarize Transcript",
                         # 2 "Translate Transcript"
+                        actions = ["Summarize Meeting"]
+                        if action_items_available():
+                            actions.append("Action Items (DeepSeek)")
                         app_mode = st.sidebar.radio(
                             "Choose an action:",
-                            [
-                                "Summarize Meeting",
-                                "Action Items (DeepSeek)",
-                            ],
+                            actions,
                         )
 
+                        # generation runs in job_worker.py; this session only polls
                         if app_mode == "Summarize Meeting":
-                            if st.sidebar.button("🧠 Generate Summary"):
-                                with st.spinner("Summarizing..."):
-                                    messages = get_messages(room_name)
-                                    text = ""
-                                    for (
-                                        user,
-                                        msg,
-                                        lang,
-                                        translated_msg,
-                                        translated_lang,
-                                        timestamp,
-                                    ) in messages:
-                                        text += format_message(user, translated_msg)
-                                    summary = generate_summary(text)
-                                    # print("Debug: summary content- ", text)
-
-                                update_chatroom_summary(
-                                    room_name, default_language, summary
-                                )
-                        elif app_mode == "Action Items (DeepSeek)":
-                            if st.sidebar.button("🐋 Extract with DeepSeek"):
-                                with st.spinner(
-                                    "Analyzing transcript with DeepSeek..."
-                                ):
-                                    messages = get_messages(room_name)
-                                    text = ""
-                                    for (
-                                        user,
-                                        msg,
-                                        lang,
-                                        translated_msg,
-                                        translated_lang,
-                                        timestamp,
-                                    ) in messages:
-                                        text += format_message(user, translated_msg)
-                                    full_text = extract_action_items_with_deepseek(text)
-                                update_chatroom_action_item(
-                                    room_name, default_language, full_text
-                                )
+                            job_kind, button_label = "summary", "🧠 Generate Summary"
+                        else:
+                            job_kind, button_label = "action_items", "🐋 Extract with DeepSeek"
+                        if st.sidebar.button(button_label):
+                            enqueue(job_kind, room_name, default_language)
+                        job = get_latest_job(room_name, job_kind)
+                        if job is not None:
+                            with st.sidebar:
+                                show_job_status(job["id"])
 
                 chatroom_summary = get_chatroom_summary(room_name)
                 # print(chatroom_summary)
@@ -586,16 +587,11 @@ elif menu == "Chatroom":
                         chatroom_summary["summary"]
                         and chatroom_summary["summary"].strip()
                     ):
-                        display_content = chatroom_summary["summary"]
-                        if (
-                            chatroom_summary["languages"]
-                            != st.session_state.user_language_code
-                        ):
-                            display_content = translate_text(
-                                display_content,
-                                src_lang=chatroom_summary["languages"],
-                                tgt_lang=st.session_state.user_language_code,
-                            )
+                        display_content = get_display_summary(
+                            chatroom_summary,
+                            "summary",
+                            st.session_state.user_language_code,
+                        )
 
                         col1, col2 = st.columns(2)
                         with col1:
@@ -615,16 +611,11 @@ elif menu == "Chatroom":
                         chatroom_summary["action_item"]
                         and chatroom_summary["action_item"].strip()
                     ):
-                        display_content = chatroom_summary["action_item"]
-                        if (
-                            chatroom_summary["languages"]
-                            != st.session_state.user_language_code
-                        ):
-                            display_content = translate_text(
-                                display_content,
-                                src_lang=chatroom_summary["languages"],
-                                tgt_lang=st.session_state.user_language_code,
-                            )
+                        display_content = get_display_summary(
+                            chatroom_summary,
+                            "action_item",
+                            st.session_state.user_language_code,
+                        )
                         col1, col2 = st.columns(2)
                         with col1:
                             st.subheader("📋 Download Action Items")
@@ -644,7 +635,9 @@ elif menu == "Chatroom":
                 if (st.session_state.keep_refresh_msg == False) or (
                     not st.session_state.messages
                 ):
-                    messages = get_messages(room_name)
+                    messages = get_messages(
+                        room_name, st.session_state.user_language_code
+                    )
                     for (
                         user,
                         msg,
@@ -652,19 +645,16 @@ elif menu == "Chatroom":
                         translated_msg,
                         translated_lang,
                         timestamp,
+                        fanned_out,
                     ) in messages:
-                        display_msg = ""
-                        if st.session_state.user_language_code == lang:
-                            display_msg = msg
-                        elif st.session_state.user_language_code == translated_lang:
-                            display_msg = translated_msg
-                        else:
-                            # use default lang and translate to target language
-                            display_msg = translate_text(
-                                translated_msg,
-                                src_lang=translated_lang,
-                                tgt_lang=st.session_state.user_language_code,
-                            )
+                        display_msg = get_display_message(
+                            msg,
+                            lang,
+                            translated_msg,
+                            translated_lang,
+                            fanned_out,
+                            st.session_state.user_language_code,
+                        )
                         st.session_state.messages.append(
                             f"{timestamp} - {user}: {display_msg}"
                         )
@@ -758,7 +748,9 @@ elif menu == "Chatroom":
                     while st.session_state.keep_refresh_msg:
                         have_new_message = False
                         messages = get_messages_periodically(
-                            room_name, st.session_state.current_time_stamp
+                            room_name,
+                            st.session_state.current_time_stamp,
+                            st.session_state.user_language_code,
                         )
                         for (
                             user,
@@ -767,19 +759,16 @@ elif menu == "Chatroom":
                             translated_msg,
                             translated_lang,
                             timestamp,
+                            fanned_out,
                         ) in messages:
-                            display_msg = ""
-                            if st.session_state.user_language_code == lang:
-                                display_msg = msg
-                            elif st.session_state.user_language_code == translated_lang:
-                                display_msg = translated_msg
-                            else:
-                                # use default lang and translate to target language
-                                display_msg = translate_text(
-                                    translated_msg,
-                                    src_lang=translated_lang,
-                                    tgt_lang=st.session_state.user_language_code,
-                                )
+                            display_msg = get_display_message(
+                                msg,
+                                lang,
+                                translated_msg,
+                                translated_lang,
+                                fanned_out,
+                                st.session_state.user_language_code,
+                            )
                             # keep message that will be show when user click send button
                             st.session_state.messages.append(
                                 f"{timestamp} - {user}: {display_msg}"